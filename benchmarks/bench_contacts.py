@@ -0,0 +1,89 @@
+"""Micro-benchmark for contact extraction over a synthetic resume corpus
+
+    python benchmarks/bench_contacts.py --texts 100000 --min-rate 8000
+
+Exits non-zero if throughput drops below --min-rate texts/second or if any planted
+email or phone number is missed.
+
+Runs on a development machine land around 12-20k texts/s depending on load; the gate of
+8000 leaves room for slower CI runners while still catching a pathological regression.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from contacts import extract_contacts_batch  # noqa: E402
+
+FIRST_NAMES = ['james', 'maria', 'wei', 'aisha', 'carlos', 'olga', 'liam', 'priya', 'kenji', 'fatima']
+LAST_NAMES = ['smith', 'garcia', 'chen', 'khan', 'silva', 'ivanova', 'brown', 'patel', 'sato', 'haddad']
+DOMAINS = ['gmail.com', 'outlook.com', 'yahoo.com', 'proton.me', 'company.io']
+FILLER = [
+    'Led a team of five engineers delivering a payments platform.',
+    'Reduced build times by 40% between 2018-2021 through caching.',
+    'Python, SQL, AWS, Docker, Kubernetes, Terraform.',
+    'B.Sc. Computer Science, State University, 2012 - 2016.',
+    'Managed budgets of $1,200,000 across 3 regions.',
+    'Volunteer mentor, 2019-present. References available on request.',
+]
+PHONE_FORMATS = ['({a}) {b}-{c}', '{a}-{b}-{c}', '{a}.{b}.{c}', '+1 {a} {b} {c}', '1-{a}-{b}-{c}']
+LABELS = ['Phone:', 'Mobile:', 'Cell', 'Tel.', '']
+
+
+def make_corpus(count: int, seed: int = 0):
+    """Build resume-like texts, each with one planted email and phone; returns (texts, expected)"""
+    rng = random.Random(seed)
+    texts = []
+    expected = []
+    for _ in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first}.{last}{rng.randint(1, 999)}@{rng.choice(DOMAINS)}"
+        area, exchange, line = rng.randint(200, 989), rng.randint(200, 999), rng.randint(0, 9999)
+        phone = rng.choice(PHONE_FORMATS).format(a=area, b=exchange, c=f'{line:04d}')
+
+        body = rng.sample(FILLER, k=rng.randint(3, len(FILLER)))
+        header = f"{first.title()} {last.title()}\n{rng.choice(LABELS)} {phone} | Email: {email.upper() if rng.random() < 0.1 else email}"
+        texts.append('\n'.join([header] + body * rng.randint(1, 4)))
+        expected.append((email, f'+1{area}{exchange}{line:04d}'))
+    return texts, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=100000, help='number of synthetic resumes')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs; the best is reported')
+    parser.add_argument('--min-rate', type=float, default=0, help='fail below this many texts/second')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    texts, expected = make_corpus(args.texts, args.seed)
+    corpus_mb = sum(len(text) for text in texts) / 1e6
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = extract_contacts_batch(texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    missed = sum(
+        1 for result, (email, phone) in zip(results, expected)
+        if result['emails'][:1] != [email] or result['phones'][:1] != [phone]
+    )
+    rate = len(texts) / best
+    print(f"texts:      {len(texts)} ({corpus_mb:.1f} MB)")
+    print(f"best time:  {best:.3f}s over {args.repeat} run(s)")
+    print(f"throughput: {rate:,.0f} texts/s, {corpus_mb / best:.1f} MB/s")
+    print(f"missed:     {missed}")
+
+    if missed:
+        sys.exit(f"FAIL: {missed} planted contacts were not ranked first")
+    if args.min_rate and rate < args.min_rate:
+        sys.exit(f"FAIL: {rate:,.0f} texts/s is below the {args.min_rate:,.0f} texts/s budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start benchmark: time to import the web server and what the import pulls in
+
+Imports src/webhook_server.py in a fresh interpreter under `python -X importtime`, best of
+--repeat runs, and lists the slowest top-level imports:
+
+    python benchmarks/bench_import.py --max-ms 400
+
+Exits non-zero if the import takes longer than --max-ms, or if any module that should
+only load once a job runs (selenium, OCR, DOCX, HTML parsing) is imported at startup.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Loaded at the point of use by a job, never by importing the server
+DEFERRED_MODULES = ['selenium', 'webdriver_manager', 'pandas', 'numpy', 'pytesseract', 'pdf2image', 'docx', 'bs4', 'lxml']
+
+PROBE = (
+    'import sys, webhook_server; '
+    'print(",".join(m for m in sys.argv[1:] if m in sys.modules))'
+)
+
+
+def import_profile(module_names):
+    """Run one cold import and return (total microseconds, {module: cumulative us}, deferred modules loaded)"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC_DIR))
+    # The server creates its data directories on import, so keep them out of the repo
+    with tempfile.TemporaryDirectory(prefix='bench_import_') as work_dir:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, *module_names],
+            cwd=work_dir, env=env, capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        sys.exit(f"FAIL: importing webhook_server failed:\n{result.stderr[-2000:]}")
+
+    top_level = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports are the ones importtime does not indent
+        if not name.startswith('  ') and name.strip():
+            top_level[name.strip()] = int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return top_level.get('webhook_server', 0), top_level, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='cold imports to run; the fastest counts')
+    parser.add_argument('--max-ms', type=float, default=400, help='fail above this import time')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args()
+
+    runs = [import_profile(DEFERRED_MODULES) for _ in range(args.repeat)]
+    total_us, top_level, loaded = min(runs, key=lambda run: run[0])
+
+    print(f"import webhook_server: {total_us / 1000:.1f} ms (best of {args.repeat})")
+    print(f"{'module':<40}{'cumulative ms':>15}")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40}{cumulative / 1000:>15.1f}")
+
+    if loaded:
+        sys.exit(f"FAIL: imported at startup but should load lazily: {', '.join(loaded)}")
+    if args.max_ms and total_us / 1000 > args.max_ms:
+        sys.exit(f"FAIL: {total_us / 1000:.1f} ms is above the {args.max_ms} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""End-to-end benchmark of the scraping pipeline against the offline fixture site
+
+Starts benchmarks/fixture_site.py in-process, drives headless Chrome through login,
+search, pagination, detail pages, downloads and CSV export, and reports cards/sec plus
+p50/p95 latency and peak RSS (this process plus Chrome) for every stage, plus bytes and
+DOMContentLoaded time per page type:
+
+    python benchmarks/bench_pipeline.py --results 50 --latency-ms 100 --failure-rate 0.05
+    python benchmarks/bench_pipeline.py --results 50 --lightweight
+
+Needs Chrome and chromedriver. Exits non-zero below --min-cards-per-sec.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fixture_site import add_fixture_arguments, config_from_args, start_fixture_site  # noqa: E402
+
+
+def _process_rss_mb(pid='self') -> float:
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class MemorySampler(threading.Thread):
+    """Samples RSS of this process and the scraper's Chrome processes"""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(name='rss-sampler', daemon=True)
+        self.interval = interval
+        self.scraper = None
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = _process_rss_mb()
+            if self.scraper is not None and self.scraper.driver is not None:
+                rss += self.scraper.memory_usage_mb() or 0.0
+            self.samples.append((time.perf_counter(), rss))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def peak_between(self, start: float, end: float) -> float:
+        return max((rss for t, rss in self.samples if start <= t <= end), default=0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--results', type=int, default=30, help='max_results for the search')
+    parser.add_argument('--min-cards-per-sec', type=float, default=0, help='fail below this throughput')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--headed', action='store_true', help='show the browser window')
+    parser.add_argument('--lightweight', action='store_true', help='block images, fonts, media and trackers')
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    server = start_fixture_site(config_from_args(args))
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ.update({
+        'INDEED_BASE_URL': base_url,
+        'INDEED_LOGIN_URL': f'{base_url}/account/login',
+        'INDEED_EMAIL': 'bench@example.net',
+        'INDEED_PASSWORD': 'fixture',
+        'CHROME_HEADLESS': '' if args.headed else '1',
+        'LIGHTWEIGHT_PAGES': '1' if args.lightweight else '',
+        'FRESHNESS_HOURS': '0'
+    })
+
+    # Imported after the environment is set; the scraper reads it at construction
+    from scraper import IndeedResumeScraper
+    from resume_store import ResumeStore
+    from export import CsvResultWriter
+    from metrics import JobTimer, timed_stage
+
+    class RecordingTimer(JobTimer):
+        """JobTimer that also keeps every span so percentiles and RSS windows can be computed"""
+
+        def __init__(self):
+            super().__init__('bench')
+            self.spans = []
+
+        def record(self, stage, seconds, failed=False):
+            super().record(stage, seconds, failed)
+            end = time.perf_counter()
+            self.spans.append((stage, end - seconds, end, seconds, failed))
+
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    os.chdir(work_dir)
+    timer = RecordingTimer()
+    sampler = MemorySampler()
+    sampler.start()
+
+    scraper = None
+    cards = 0
+    started = time.perf_counter()
+    try:
+        scraper = IndeedResumeScraper(
+            resume_store=ResumeStore(os.path.join(work_dir, 'store'), os.path.join(work_dir, 'resumes.db'))
+        )
+        scraper.timer = timer
+        sampler.scraper = scraper
+        # Started before login so driver_startup is not also counted in the login stage
+        scraper.ensure_driver()
+
+        if not scraper.login():
+            sys.exit('FAIL: could not log in to the fixture site')
+
+        search_started = time.perf_counter()
+        with CsvResultWriter(os.path.join(work_dir, 'results.csv')) as writer:
+            for record in scraper.iter_resumes({'keywords': 'python', 'location': 'New York'},
+                                               max_results=args.results):
+                with timed_stage('export', timer):
+                    writer.write(record)
+                cards += 1
+        search_seconds = time.perf_counter() - search_started
+    finally:
+        total_seconds = time.perf_counter() - started
+        page_totals = {}
+        if scraper is not None:
+            page_totals = scraper.page_totals
+            scraper.cleanup()
+        sampler.stop()
+        server.shutdown()
+
+    stages = {}
+    for stage, start, end, seconds, failed in timer.spans:
+        entry = stages.setdefault(stage, {'durations': [], 'failures': 0, 'peak_rss_mb': 0.0})
+        entry['durations'].append(seconds)
+        entry['failures'] += int(failed)
+        entry['peak_rss_mb'] = max(entry['peak_rss_mb'], sampler.peak_between(start, end))
+
+    report = {
+        'cards': cards,
+        'total_seconds': round(total_seconds, 3),
+        'search_seconds': round(search_seconds, 3),
+        'cards_per_second': round(cards / search_seconds, 3) if search_seconds else 0.0,
+        'peak_rss_mb': round(max((rss for _, rss in sampler.samples), default=0.0), 1),
+        'stages': {
+            stage: {
+                'count': len(entry['durations']),
+                'failures': entry['failures'],
+                'p50_seconds': round(_percentile(entry['durations'], 0.50), 3),
+                'p95_seconds': round(_percentile(entry['durations'], 0.95), 3),
+                'peak_rss_mb': round(entry['peak_rss_mb'], 1)
+            }
+            for stage, entry in stages.items()
+        },
+        'pages': {
+            page: {
+                'count': totals['count'],
+                'avg_bytes': round(totals['bytes'] / totals['count']),
+                'avg_dom_ready_seconds': round(totals['load_seconds'] / totals['count'], 3)
+            }
+            for page, totals in page_totals.items()
+        }
+    }
+
+    print(f"cards:        {report['cards']} in {report['search_seconds']}s "
+          f"({report['cards_per_second']} cards/s), total {report['total_seconds']}s")
+    detail = report['stages'].get('detail')
+    if detail:
+        print(f"per card:     p50 {detail['p50_seconds']}s, p95 {detail['p95_seconds']}s")
+    print(f"peak RSS:     {report['peak_rss_mb']} MB")
+    print(f"{'stage':<16}{'count':>7}{'failed':>8}{'p50 s':>9}{'p95 s':>9}{'peak MB':>10}")
+    for stage, entry in report['stages'].items():
+        print(f"{stage:<16}{entry['count']:>7}{entry['failures']:>8}"
+              f"{entry['p50_seconds']:>9.3f}{entry['p95_seconds']:>9.3f}{entry['peak_rss_mb']:>10.1f}")
+    print(f"{'page':<16}{'count':>7}{'avg bytes':>12}{'avg ready s':>13}")
+    for page, entry in report['pages'].items():
+        print(f"{page:<16}{entry['count']:>7}{entry['avg_bytes']:>12}{entry['avg_dom_ready_seconds']:>13.3f}")
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.min_cards_per_sec and report['cards_per_second'] < args.min_cards_per_sec:
+        sys.exit(f"FAIL: {report['cards_per_second']} cards/s is below the {args.min_cards_per_sec} budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark of the background Drive/Sheets uploader against the fake Google API
+
+Enqueues spreadsheet rows and resume files the way a scrape job does, then waits for the
+uploader to drain. Reports the enqueue cost seen by the scraping thread, the number of
+API requests, and how long the uploads took with latency and failures injected:
+
+    python benchmarks/bench_upload.py --rows 2000 --files 50 --latency-ms 200 --failure-rate 0.1
+
+Some appends are applied but answered with 503 (--lost-rate), and --bad-rows rows are
+refused by the fake Sheets API. Exits non-zero if enqueue p95 exceeds --max-enqueue-ms,
+if any good row or file is missing or any row arrived twice, or if a bad row took good
+rows down with it.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fake_google_api import REJECTED_CELL, FakeGoogleState, start_fake_google_api  # noqa: E402
+from uploader import GoogleUploader  # noqa: E402
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='spreadsheet rows to append')
+    parser.add_argument('--files', type=int, default=50, help='resume files to upload')
+    parser.add_argument('--file-kb', type=int, default=600, help='size of each file')
+    parser.add_argument('--latency-ms', type=float, default=100, help='delay added to every API request')
+    parser.add_argument('--failure-rate', type=float, default=0.05, help='share of API requests failing with 503')
+    parser.add_argument('--lost-rate', type=float, default=0.05, help='share of appends applied but answered with 503')
+    parser.add_argument('--bad-rows', type=int, default=3, help='rows the fake API refuses')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the injected failures')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent Drive uploads')
+    parser.add_argument('--batch-rows', type=int, default=500, help='rows per values.append request')
+    parser.add_argument('--max-enqueue-ms', type=float, default=20, help='fail above this enqueue p95')
+    parser.add_argument('--timeout', type=float, default=300, help='give up waiting for the drain after this long')
+    args = parser.parse_args()
+    # Injected failures make the uploader log a retry warning each
+    logging.getLogger('uploader').setLevel(logging.ERROR)
+
+    state = FakeGoogleState(args.latency_ms, args.failure_rate, seed=args.seed, lost_rate=args.lost_rate)
+    server = start_fake_google_api(state)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    work_dir = tempfile.mkdtemp(prefix='bench_upload_')
+
+    uploader = GoogleUploader(
+        db_path=os.path.join(work_dir, 'uploads.db'),
+        session_factory=requests.Session,
+        spreadsheet_id='bench-sheet',
+        max_workers=args.workers,
+        batch_rows=args.batch_rows,
+        flush_interval=0.5,
+        chunk_size=256 * 1024,
+        max_attempts=20,
+        backoff_base=0.05,
+        backoff_max=1.0,
+        drive_upload_url=f'{base_url}/upload/drive/v3',
+        sheets_url=f'{base_url}/v4'
+    )
+
+    paths = []
+    for i in range(args.files):
+        path = os.path.join(work_dir, f'resume_{i}.pdf')
+        with open(path, 'wb') as f:
+            f.write(os.urandom(args.file_kb * 1024))
+        paths.append(path)
+
+    uploader.start()
+    started = time.perf_counter()
+    enqueue_ms = []
+    files_every = max(1, args.rows // max(1, args.files))
+    bad_every = args.rows // args.bad_rows if args.bad_rows else 0
+    for i in range(args.rows):
+        t = time.perf_counter()
+        if bad_every and i % bad_every == bad_every // 2:
+            uploader.enqueue_rows([[f'bad{i:06d}', REJECTED_CELL]])
+        uploader.enqueue_rows([[f'fx{i:06d}', f'Candidate {i}', 'New York, NY', f'c{i}@example.net']])
+        if i % files_every == 0 and i // files_every < len(paths):
+            uploader.enqueue_file(paths[i // files_every])
+        enqueue_ms.append((time.perf_counter() - t) * 1000)
+    enqueue_seconds = time.perf_counter() - started
+
+    while uploader.pending() and time.perf_counter() - started < args.timeout:
+        time.sleep(0.1)
+    drain_seconds = time.perf_counter() - started
+    uploader.stop()
+    server.shutdown()
+
+    sheet = [row[0] for row in state.rows.get('bench-sheet', [])]
+    rows_uploaded = len(set(sheet))
+    duplicates = len(sheet) - rows_uploaded
+    failed_rows = uploader.stats().get('rows', {}).get('failed', 0)
+    files_uploaded = len(state.files)
+    p50, p95 = _percentile(enqueue_ms, 0.5), _percentile(enqueue_ms, 0.95)
+    print(f"enqueue:      {args.rows} rows + {len(paths)} files in {enqueue_seconds:.2f}s "
+          f"(p50 {p50:.2f} ms, p95 {p95:.2f} ms per record)")
+    print(f"drained in:   {drain_seconds:.2f}s")
+    print(f"rows:         {rows_uploaded}/{args.rows} in {state.requests['append']} append request(s), "
+          f"{duplicates} duplicate(s), {state.requests['read']} read(s) to check lost responses")
+    print(f"files:        {files_uploaded}/{len(paths)} via {state.requests['session']} session(s), "
+          f"{state.requests['chunk']} chunk request(s)")
+    print(f"injected 503: {state.requests['failed']}, lost responses: {state.requests['lost']}")
+    print(f"bad rows:     {failed_rows}/{args.bad_rows} given up on, {state.requests['rejected']} rejected append(s)")
+    print(f"queue:        {uploader.stats()}")
+
+    if rows_uploaded < args.rows or files_uploaded < len(paths):
+        sys.exit('FAIL: not everything was uploaded')
+    if duplicates:
+        sys.exit(f'FAIL: {duplicates} row(s) were appended twice')
+    if failed_rows != args.bad_rows:
+        sys.exit(f'FAIL: {failed_rows} row(s) given up on, expected only the {args.bad_rows} bad one(s)')
+    if p95 > args.max_enqueue_ms:
+        sys.exit(f"FAIL: enqueue p95 {p95:.2f} ms is above the {args.max_enqueue_ms} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Local stand-in for the Drive resumable upload and Sheets values.append endpoints
+
+Accepts chunked resumable uploads, row appends and reads, with configurable latency, a share
+of requests failing with 503 so retries are exercised, and a share of appends applied but
+answered with 503 as if the response was lost. Appends holding a REJECTED_CELL value are
+refused with 400:
+
+    python benchmarks/fake_google_api.py --port 8001 --latency-ms 200 --failure-rate 0.1 --lost-rate 0.05
+
+Point the uploader at it with GOOGLE_DRIVE_UPLOAD_URL=http://127.0.0.1:8001/upload/drive/v3
+and GOOGLE_SHEETS_API_URL=http://127.0.0.1:8001/v4.
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CONTENT_RANGE_RE = re.compile(r'bytes (?:(\d+)-(\d+)|\*)/(\d+)')
+APPEND_RE = re.compile(r'^/v4/spreadsheets/([^/]+)/values/(.+):append$')
+VALUES_RE = re.compile(r'^/v4/spreadsheets/([^/]+)/values/([^:]+)$')
+
+# A cell value the fake Sheets API refuses, to exercise permanent row errors
+REJECTED_CELL = '#REJECT'
+
+
+class FakeGoogleState:
+    def __init__(self, latency_ms=0.0, failure_rate=0.0, seed=0, lost_rate=0.0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.lost_rate = lost_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.files = {}
+        self.rows = {}
+        self.requests = {'session': 0, 'chunk': 0, 'append': 0, 'read': 0, 'failed': 0, 'lost': 0, 'rejected': 0}
+
+    def delay(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            failed = self.rng.random() < self.failure_rate
+            if failed:
+                self.requests['failed'] += 1
+            return failed
+
+    def response_lost(self) -> bool:
+        with self.lock:
+            lost = self.rng.random() < self.lost_rate
+            if lost:
+                self.requests['lost'] += 1
+            return lost
+
+    def count(self, kind: str):
+        with self.lock:
+            self.requests[kind] += 1
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    state = FakeGoogleState()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _json(self, status: int, payload: dict, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _empty(self, status: int, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        self.state.delay()
+        url = urlparse(self.path)
+        body = self._body()
+        if self.state.should_fail():
+            return self._json(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+
+        if url.path == '/upload/drive/v3/files':
+            self.state.count('session')
+            with self.state.lock:
+                upload_id = str(len(self.state.sessions) + 1)
+                self.state.sessions[upload_id] = {
+                    'metadata': json.loads(body or b'{}'),
+                    'total': int(self.headers.get('X-Upload-Content-Length') or 0),
+                    'data': bytearray()
+                }
+            host = self.headers.get('Host')
+            return self._empty(200, {
+                'Location': f'http://{host}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}'
+            })
+
+        match = APPEND_RE.match(url.path)
+        if match:
+            self.state.count('append')
+            values = json.loads(body)['values']
+            if any(REJECTED_CELL in row for row in values):
+                self.state.count('rejected')
+                return self._json(400, {'error': {'code': 400, 'message': 'Invalid value'}})
+            with self.state.lock:
+                self.state.rows.setdefault(match.group(1), []).extend(values)
+            if self.state.response_lost():
+                return self._json(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+            return self._json(200, {'updates': {
+                'spreadsheetId': match.group(1),
+                'updatedRange': unquote(match.group(2)),
+                'updatedRows': len(values)
+            }})
+
+        self._json(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    def do_GET(self):
+        self.state.delay()
+        url = urlparse(self.path)
+        match = VALUES_RE.match(url.path)
+        if match is None:
+            return self._json(404, {'error': {'code': 404, 'message': 'Not found'}})
+        if self.state.should_fail():
+            return self._json(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+        self.state.count('read')
+        with self.state.lock:
+            values = list(self.state.rows.get(match.group(1), []))
+        self._json(200, {'range': unquote(match.group(2)), 'values': values})
+
+    def do_PUT(self):
+        self.state.delay()
+        url = urlparse(self.path)
+        body = self._body()
+        upload_id = parse_qs(url.query).get('upload_id', [None])[0]
+        session = self.state.sessions.get(upload_id)
+        if session is None:
+            return self._json(404, {'error': {'code': 404, 'message': 'Upload session not found'}})
+        if self.state.should_fail():
+            return self._json(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+
+        self.state.count('chunk')
+        start, _, total = CONTENT_RANGE_RE.match(self.headers.get('Content-Range', '')).groups()
+        with self.state.lock:
+            # Only a chunk that starts where the stored bytes end is accepted
+            if start is not None and int(start) == len(session['data']):
+                session['data'] += body
+            received = len(session['data'])
+            if received >= int(total):
+                file_id = f'file{upload_id}'
+                self.state.files[file_id] = {'name': session['metadata'].get('name'), 'size': received}
+                return self._json(200, {'id': file_id, 'name': session['metadata'].get('name')})
+        headers = {'Range': f'bytes=0-{received - 1}'} if received else {}
+        self._empty(308, headers)
+
+
+def start_fake_google_api(state: FakeGoogleState, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serve the fake API on a background thread; port 0 picks a free port"""
+    handler = type('ConfiguredFakeGoogleHandler', (FakeGoogleHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='fake-google-api', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every request')
+    parser.add_argument('--failure-rate', type=float, default=0, help='share of requests answered with 503')
+    parser.add_argument('--lost-rate', type=float, default=0, help='share of appends applied but answered with 503')
+    args = parser.parse_args()
+
+    state = FakeGoogleState(args.latency_ms, args.failure_rate, lost_rate=args.lost_rate)
+    server = start_fake_google_api(state, args.host, args.port)
+    print(f"Fake Google API on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
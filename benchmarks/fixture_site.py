@@ -0,0 +1,267 @@
+"""Offline stand-in for the Indeed pages the scraper drives
+
+Serves synthetic login, search, result, resume and download pages built from the same
+selectors as src/extraction.py, with configurable latency and failure injection:
+
+    python benchmarks/fixture_site.py --port 8000 --candidates 200 --latency-ms 150 --failure-rate 0.05
+
+Point the scraper at it with INDEED_BASE_URL=http://127.0.0.1:8000 and
+INDEED_LOGIN_URL=http://127.0.0.1:8000/account/login.
+"""
+import time
+import random
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+SESSION_COOKIE = 'fixture_session'
+
+FIRST_NAMES = ['James', 'Maria', 'Wei', 'Aisha', 'Carlos', 'Olga', 'Liam', 'Priya', 'Kenji', 'Fatima']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Khan', 'Silva', 'Ivanova', 'Brown', 'Patel', 'Sato', 'Haddad']
+CITIES = ['New York, NY', 'Austin, TX', 'Seattle, WA', 'Chicago, IL', 'Denver, CO']
+
+
+def candidate(index: int) -> dict:
+    """Deterministic synthetic candidate for a result position"""
+    rng = random.Random(index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        'id': f'fx{index:06d}',
+        'name': f'{first} {last}',
+        'location': rng.choice(CITIES),
+        'email': f'{first.lower()}.{last.lower()}{index}@example.net',
+        'phone': f'({rng.randint(200, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}'
+    }
+
+
+def make_pdf(text: str, padding_bytes: int = 0) -> bytes:
+    """Minimal single-page PDF with a text layer, padded to simulate larger resumes"""
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode('latin-1')
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    # Comments are ignored by PDF readers, so padding keeps the file valid
+    out += b'%' + b'x' * padding_bytes + b'\n' if padding_bytes else b''
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+class FixtureConfig:
+    def __init__(self, candidates=100, page_size=10, latency_ms=0.0, jitter_ms=0.0,
+                 failure_rate=0.0, pdf_padding_bytes=20000, asset_bytes=40000, seed=0):
+        self.candidates = candidates
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.pdf_padding_bytes = pdf_padding_bytes
+        self.asset_bytes = asset_bytes
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self.lock:
+                jitter = self.rng.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.failure_rate
+
+
+# Page furniture the scraper never reads, so lightweight-page mode has something to block
+ASSETS_HEAD = (
+    '<style>@font-face{font-family:Fixture;src:url(/static/fixture.woff2) format("woff2")}'
+    'body{font-family:Fixture,sans-serif}</style>'
+)
+ASSETS_BODY = '<img src="/static/logo.png" alt=""><img src="/static/banner.jpg" alt="">'
+
+
+def _page(title: str, body: str, logged_in: bool) -> str:
+    menu = '<div data-tn-component="auth-header-account-menu">Account</div>' if logged_in else \
+        '<a data-gnav-element-name="SignIn" href="/account/login">Sign in</a>'
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{escape(title)}</title>{ASSETS_HEAD}</head>'
+        f'<body><header>{menu}{ASSETS_BODY}</header><main>{body}</main></body></html>'
+    )
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    config = FixtureConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _logged_in(self) -> bool:
+        return f'{SESSION_COOKIE}=1' in (self.headers.get('Cookie') or '')
+
+    def _send(self, status: int, body: bytes, content_type: str = 'text/html; charset=utf-8', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _html(self, title: str, body: str, status: int = 200):
+        self._send(status, _page(title, body, self._logged_in()).encode('utf-8'))
+
+    def do_GET(self):
+        self.config.delay()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/':
+            self._html('Home', '<h1>Fixture Indeed</h1>')
+        elif url.path == '/account/login':
+            self._html('Sign in', (
+                '<form method="post" action="/account/login">'
+                '<input id="login-email-input" name="email" type="email">'
+                '<input id="login-password-input" name="password" type="password">'
+                '<button id="login-submit-button" type="submit">Sign in</button>'
+                '</form>'
+            ))
+        elif url.path in ('/resumes', '/resumes/search'):
+            if not self._logged_in():
+                return self._redirect('/account/login')
+            self._html('Find resumes', (
+                '<form method="get" action="/resumes/results">'
+                '<input data-tn-element="resume-search-input" name="q">'
+                '<input data-tn-element="resume-location-input" name="l">'
+                '<button data-tn-element="resume-search-button" type="submit">Find</button>'
+                '</form>'
+            ))
+        elif url.path == '/resumes/results':
+            self._results(query)
+        elif url.path.startswith('/r/'):
+            self._resume(url.path.rsplit('/', 1)[-1])
+        elif url.path.startswith('/download/'):
+            self._download(url.path.rsplit('/', 1)[-1].split('.')[0])
+        elif url.path.startswith('/static/'):
+            self._send(200, b'\0' * self.config.asset_bytes, 'application/octet-stream',
+                       {'Cache-Control': 'no-store'})
+        else:
+            self._html('Not found', '<p>Not found</p>', status=404)
+
+    def do_POST(self):
+        self.config.delay()
+        if urlparse(self.path).path == '/account/login':
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            return self._redirect('/', cookie=f'{SESSION_COOKIE}=1; Path=/')
+        self._html('Not found', '<p>Not found</p>', status=404)
+
+    def _redirect(self, location: str, cookie: str = None):
+        self.send_response(303)
+        self.send_header('Location', location)
+        if cookie:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _results(self, query):
+        start = int(query.get('start', ['0'])[0])
+        end = min(start + self.config.page_size, self.config.candidates)
+        cards = []
+        for index in range(start, end):
+            person = candidate(index)
+            cards.append(
+                f'<div class="resume-card" data-resume-key="{person["id"]}">'
+                f'<a href="/r/{person["name"].replace(" ", "-")}/{person["id"]}">'
+                f'<span class="resume-name">{escape(person["name"])}</span></a>'
+                f'<span class="resume-location">{escape(person["location"])}</span></div>'
+            )
+        next_link = ''
+        if end < self.config.candidates:
+            params = {key: values[0] for key, values in query.items()}
+            params['start'] = end
+            next_link = f'<a rel="next" data-tn-element="next-page" href="/resumes/results?{urlencode(params)}">Next</a>'
+        self._html('Results', ''.join(cards) + next_link)
+
+    def _resume(self, candidate_id: str):
+        if self.config.should_fail():
+            return self._html('Error', '<p>Something went wrong</p>', status=500)
+        person = candidate(int(candidate_id[2:]))
+        self._html(person['name'], (
+            f'<div class="resume-details"><h1>{escape(person["name"])}</h1>'
+            f'<p>{escape(person["location"])}</p>'
+            f'<p>Email: {person["email"]}</p><p>Mobile: {person["phone"]}</p>'
+            '<p>Senior software engineer. Python, SQL, AWS.</p></div>'
+            f'<a data-tn-element="download-resume" href="/download/{person["id"]}.pdf" download>Download</a>'
+        ))
+
+    def _download(self, candidate_id: str):
+        if self.config.should_fail():
+            return self._send(500, b'error', 'text/plain')
+        person = candidate(int(candidate_id[2:]))
+        body = make_pdf(f'{person["name"]} {person["email"]} {person["phone"]}', self.config.pdf_padding_bytes)
+        self._send(200, body, 'application/pdf', {
+            'Content-Disposition': f'attachment; filename="{person["id"]}.pdf"'
+        })
+
+
+def start_fixture_site(config: FixtureConfig, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serve the fixture site on a background thread; port 0 picks a free port"""
+    handler = type('ConfiguredFixtureHandler', (FixtureHandler,), {'config': config})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='fixture-site', daemon=True).start()
+    return server
+
+
+def add_fixture_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--candidates', type=int, default=100, help='total search results')
+    parser.add_argument('--page-size', type=int, default=10, help='cards per results page')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='extra random delay up to this much')
+    parser.add_argument('--failure-rate', type=float, default=0, help='share of resume/download requests that fail')
+    parser.add_argument('--pdf-padding-bytes', type=int, default=20000, help='padding added to each PDF')
+    parser.add_argument('--asset-bytes', type=int, default=40000, help='size of each image and font')
+
+
+def config_from_args(args) -> FixtureConfig:
+    return FixtureConfig(
+        candidates=args.candidates,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        pdf_padding_bytes=args.pdf_padding_bytes,
+        asset_bytes=args.asset_bytes
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_fixture_site(config_from_args(args), args.host, args.port)
+    print(f"Fixture site on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
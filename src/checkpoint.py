@@ -0,0 +1,93 @@
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Progress of a job as replayed from its journal"""
+
+    def __init__(self):
+        self.filters: Optional[Dict] = None
+        self.csv_path: Optional[str] = None
+        self.page_number = 1
+        self.page_url: Optional[str] = None
+        self.processed: Set[str] = set()
+        self.files: List[str] = []
+        self.done = False
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal of a job's query, results pages and finished cards
+
+    Every entry is flushed and fsynced before the next card starts, so after a crash the
+    journal describes exactly the cards whose records were handed to the job. A torn last
+    line from a crash mid-write is ignored on replay.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _append(self, entry: Dict):
+        entry['at'] = datetime.now().isoformat()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_query(self, filters: Dict, csv_path: str):
+        self._append({'type': 'query', 'filters': filters, 'csv_path': csv_path})
+
+    def record_page(self, page_number: int, url: str):
+        """Note the results page being worked through, so a resumed job can reopen it"""
+        self._append({'type': 'page', 'page': page_number, 'url': url})
+
+    def record_card(self, key: str, record: Dict):
+        """Note a candidate whose record has been handed to the job"""
+        self._append({
+            'type': 'card',
+            'key': key,
+            'resume_path': record.get('resume_path'),
+            'resume_sha256': record.get('resume_sha256')
+        })
+
+    def record_done(self):
+        """Note that the query has no more cards to scrape"""
+        self._append({'type': 'done'})
+
+    def load(self) -> Checkpoint:
+        """Replay the journal; an absent journal gives an empty checkpoint"""
+        checkpoint = Checkpoint()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Ignoring torn checkpoint entry at {self.path}:{line_number}")
+                        break
+                    if entry['type'] == 'query':
+                        checkpoint.filters = entry['filters']
+                        checkpoint.csv_path = entry['csv_path']
+                    elif entry['type'] == 'page':
+                        checkpoint.page_number = entry['page']
+                        checkpoint.page_url = entry['url']
+                    elif entry['type'] == 'card':
+                        checkpoint.processed.add(entry['key'])
+                        if entry.get('resume_path'):
+                            checkpoint.files.append(entry['resume_path'])
+                    elif entry['type'] == 'done':
+                        checkpoint.done = True
+        except FileNotFoundError:
+            pass
+        return checkpoint
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,148 @@
+import re
+from typing import Dict, Iterable, List
+
+# Compiled once at import; extract_contacts is called for every resume in a run
+EMAIL_RE = re.compile(
+    r'(?<![\w.+-])[a-z0-9][a-z0-9._%+-]*@(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,24}(?![\w-])',
+    re.IGNORECASE
+)
+
+PHONE_RE = re.compile(r'''
+    (?<![\w+])
+    (?:(?:\+|00)\d{1,3}[\s.-]?)?
+    (?:\(\d{1,4}\)[\s.-]?)?
+    \d{2,4}(?:[\s.-]?\d{2,4}){1,4}
+    (?!\w)
+''', re.VERBOSE)
+
+# Cheap first pass: runs of digits and separators. The regex engine can skip straight to
+# the next candidate first character, so PHONE_RE only ever runs over these short spans.
+PHONE_CANDIDATE_RE = re.compile(r'[+(\d][\d\s().-]{6,}\d')
+
+NON_DIGITS_RE = re.compile(r'\D')
+
+# RFC 5321 limits the local part of an address to 64 characters and the domain to 255
+EMAIL_WINDOW_BEFORE = 64
+EMAIL_WINDOW_AFTER = 255
+
+# Words just before a number that say what it is
+PHONE_LABEL_RE = re.compile(r'(mobile|cell|phone|tel|contact|whatsapp)\W*$', re.IGNORECASE)
+FAX_LABEL_RE = re.compile(r'fax\W*$', re.IGNORECASE)
+
+# Mailboxes that are unlikely to belong to the candidate
+ROLE_MAILBOXES = {
+    'admin', 'careers', 'donotreply', 'do-not-reply', 'hr', 'info', 'jobs',
+    'no-reply', 'noreply', 'office', 'recruiting', 'support'
+}
+PLACEHOLDER_DOMAINS = {'example.com', 'example.org', 'email.com', 'domain.com'}
+
+LABEL_WINDOW = 20
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().strip('.').lower()
+
+
+def normalize_phone(raw: str, default_country_code: str = '1', labelled: bool = False) -> str:
+    """Normalize a phone number to E.164, or return '' if it cannot be a real number
+
+    Outside North America a number without a country code only counts when it is written
+    with its trunk prefix (0...) or labelled as a phone, so dates and reference numbers
+    are not mistaken for phones.
+    """
+    digits = NON_DIGITS_RE.sub('', raw)
+    stripped = raw.lstrip()
+    if stripped.startswith('+'):
+        number = digits
+    elif stripped.startswith('00'):
+        number = digits[2:]
+    elif default_country_code == '1':
+        # North American numbering plan: 10 digits, area code and exchange never start with 0 or 1
+        if len(digits) == 11 and digits[0] == '1':
+            digits = digits[1:]
+        if len(digits) != 10 or digits[0] in '01' or digits[3] in '01':
+            return ''
+        number = '1' + digits
+    else:
+        trunk = stripped.lstrip('(').startswith('0')
+        if not trunk and not labelled:
+            return ''
+        national = digits[1:] if trunk else digits
+        if not 7 <= len(national) <= 12:
+            return ''
+        number = default_country_code + national
+
+    if not 8 <= len(number) <= 15 or number[0] == '0':
+        return ''
+    return '+' + number
+
+
+def _iter_emails(text: str):
+    """EMAIL_RE matches, only searched in a window around each '@' instead of the whole text"""
+    at = text.find('@')
+    while at != -1:
+        end = at + 1
+        for match in EMAIL_RE.finditer(text, max(0, at - EMAIL_WINDOW_BEFORE), at + EMAIL_WINDOW_AFTER):
+            if match.start() <= at < match.end():
+                yield match
+                end = match.end()
+                break
+        at = text.find('@', end)
+
+
+def _iter_phones(text: str):
+    for candidate in PHONE_CANDIDATE_RE.finditer(text):
+        # One character past the span so PHONE_RE's (?!\w) still sees what follows
+        yield from PHONE_RE.finditer(text, candidate.start(), candidate.end() + 1)
+
+
+def _rank(scores: Dict[str, float]) -> List[str]:
+    return [value for value, _ in sorted(scores.items(), key=lambda item: -item[1])]
+
+
+def extract_contacts(text: str, default_country_code: str = '1') -> Dict[str, List[str]]:
+    """Find every email and phone number in a text
+
+    Emails are lowercased and phones normalized to E.164; both are deduplicated and
+    ranked most likely first. Earlier, repeated and labelled ("Mobile:", "Phone:")
+    matches rank higher; role mailboxes, placeholder domains and fax numbers rank lower.
+    """
+    emails: Dict[str, float] = {}
+    for position, match in enumerate(_iter_emails(text)):
+        email = normalize_email(match.group(0))
+        local, _, domain = email.partition('@')
+        score = 1.0 / (1 + position)
+        if local in ROLE_MAILBOXES:
+            score -= 1.0
+        if domain in PLACEHOLDER_DOMAINS:
+            score -= 2.0
+        emails[email] = emails.get(email, 0.0) + score
+
+    phones: Dict[str, float] = {}
+    position = 0
+    for match in _iter_phones(text):
+        phone = normalize_phone(match.group(0), default_country_code)
+        context = None
+        if not phone and default_country_code != '1':
+            # A bare national number still counts when a label says it is a phone
+            context = text[max(0, match.start() - LABEL_WINDOW):match.start()]
+            if FAX_LABEL_RE.search(context) or PHONE_LABEL_RE.search(context):
+                phone = normalize_phone(match.group(0), default_country_code, labelled=True)
+        if not phone:
+            continue
+        score = 1.0 / (1 + position)
+        if context is None:
+            context = text[max(0, match.start() - LABEL_WINDOW):match.start()]
+        if FAX_LABEL_RE.search(context):
+            score -= 1.0
+        elif PHONE_LABEL_RE.search(context):
+            score += 1.0
+        phones[phone] = phones.get(phone, 0.0) + score
+        position += 1
+
+    return {'emails': _rank(emails), 'phones': _rank(phones)}
+
+
+def extract_contacts_batch(texts: Iterable[str], default_country_code: str = '1') -> List[Dict[str, List[str]]]:
+    """extract_contacts over many texts, e.g. the extracted resume text of a whole run"""
+    return [extract_contacts(text, default_country_code) for text in texts]
@@ -0,0 +1,43 @@
+import os
+import time
+import logging
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+# Suffixes Chrome uses for files that are still being written
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+
+def list_downloads(directory: str) -> Set[str]:
+    """Names currently in a download directory, including partial files"""
+    try:
+        return set(os.listdir(directory))
+    except FileNotFoundError:
+        return set()
+
+
+def wait_for_download(directory: str, existing: Set[str], timeout: float = 60,
+                      poll_interval: float = 0.1) -> str:
+    """Wait until a new download in directory has finished and return its path
+
+    Chrome writes to <name>.crdownload and renames it once the last byte is on disk, so a
+    download is complete when a new file without a partial suffix exists and no partial
+    file is left. Each session downloads into its own directory, which stays nearly empty,
+    so polling it is cheap and cannot pick up another job's file.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        new_names = list_downloads(directory) - existing
+        # Chrome also creates hidden .com.google.Chrome.* scratch files while downloading
+        partial = [n for n in new_names if n.endswith(PARTIAL_SUFFIXES) or n.startswith('.')]
+        finished = [n for n in new_names if n not in partial]
+
+        if finished and not partial:
+            paths = [os.path.join(directory, n) for n in finished]
+            return max(paths, key=os.path.getmtime)
+
+        if time.monotonic() >= deadline:
+            state = 'still in progress' if partial else 'never started'
+            raise TimeoutError(f"Download {state} after {timeout}s in {directory}")
+        time.sleep(poll_interval)
@@ -0,0 +1,74 @@
+import io
+import csv
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Column order for every CSV the scraper writes
+CSV_FIELDS = [
+    'candidate_id',
+    'name',
+    'location',
+    'email',
+    'phone',
+    'profile_url',
+    'resume_path',
+    'resume_sha256',
+    'timestamp'
+]
+
+
+class CsvResultWriter:
+    """Append records to a CSV file one row at a time
+
+    The header is written and flushed when the file is opened and every row is flushed
+    as it is written, so an interrupted run still leaves a valid CSV behind.
+    """
+
+    def __init__(self, output_path: str, fields: Optional[List[str]] = None):
+        self.output_path = output_path
+        self.fields = fields or CSV_FIELDS
+        self.rows_written = 0
+        self._file = open(output_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+
+    def write(self, record: Dict):
+        """Write one record and flush it to disk"""
+        self._writer.writerow(record)
+        self._file.flush()
+        self.rows_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def to_csv_chunk(records: Iterable[Dict], include_header: bool = False,
+                 fields: Optional[List[str]] = None) -> str:
+    """Format records as CSV text for a chunked HTTP response"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields or CSV_FIELDS, extrasaction='ignore')
+    if include_header:
+        writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue()
+
+
+def record_values(record: Dict, fields: Optional[List[str]] = None) -> List[str]:
+    """A record as a list of cell values in column order, e.g. for a spreadsheet row"""
+    return ['' if record.get(field) is None else str(record.get(field)) for field in fields or CSV_FIELDS]
+
+
+def to_ndjson_chunk(records: Iterable[Dict]) -> str:
+    """Format records as newline-delimited JSON"""
+    return ''.join(json.dumps(record) + '\n' for record in records)
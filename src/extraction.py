@@ -0,0 +1,93 @@
+import logging
+from urllib.parse import urljoin, urlparse
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# lxml is several times faster than the pure-Python html.parser on large result pages
+PARSER = 'lxml'
+
+# Every CSS selector the scraper relies on, declared once
+SELECTORS = {
+    # Login
+    'sign_in_button': '[data-gnav-element-name="SignIn"]',
+    'email_input': '#login-email-input',
+    'password_input': '#login-password-input',
+    'submit_button': '#login-submit-button',
+    'account_menu': '[data-tn-component="auth-header-account-menu"]',
+    'login_error': '.error-message',
+    'verification_error': '.error-message, .errorlist',
+
+    # Search form
+    'search_input': '[data-tn-element="resume-search-input"]',
+    'location_input': '[data-tn-element="resume-location-input"]',
+    'search_button': '[data-tn-element="resume-search-button"]',
+    'experience_filter': '[data-tn-element="experience-filter"]',
+    'education_filter': '[data-tn-element="education-filter"]',
+
+    # Search results
+    'resume_card': '.resume-card',
+    'card_name': '.resume-name',
+    'card_location': '.resume-location',
+    'card_link': 'a[href]',
+    'next_page': '[data-tn-element="next-page"], a[rel="next"], a[aria-label="Next"]',
+
+    # Resume details
+    'resume_details': '.resume-details',
+    'download_button': '[data-tn-element="download-resume"]',
+}
+
+# Card attributes that carry Indeed's resume key, in order of preference
+CANDIDATE_ID_ATTRIBUTES = ('data-resume-key', 'data-rid', 'data-id')
+
+
+def _text(element, separator: str = ' ') -> Optional[str]:
+    if element is None:
+        return None
+    text = element.get_text(separator, strip=True)
+    return text or None
+
+
+def _candidate_id(card, url: Optional[str]) -> Optional[str]:
+    """Stable candidate ID from the card's data attributes, or the last segment of its resume URL"""
+    for attribute in CANDIDATE_ID_ATTRIBUTES:
+        if card.get(attribute):
+            return card[attribute]
+    if url:
+        segments = [segment for segment in urlparse(url).path.split('/') if segment]
+        if segments:
+            return segments[-1]
+    return None
+
+
+def parse_search_page(html: str, base_url: str = '') -> Dict:
+    """Parse a search results page from a single page_source snapshot
+
+    Returns the page's resume cards and the absolute URL of the next page, if any.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, PARSER)
+    cards = []
+    for card in soup.select(SELECTORS['resume_card']):
+        link = card if card.name == 'a' and card.get('href') else card.select_one(SELECTORS['card_link'])
+        url = urljoin(base_url, link['href']) if link is not None else None
+        cards.append({
+            'candidate_id': _candidate_id(card, url),
+            'name': _text(card.select_one(SELECTORS['card_name'])),
+            'location': _text(card.select_one(SELECTORS['card_location'])),
+            'url': url
+        })
+
+    next_link = soup.select_one(SELECTORS['next_page'])
+    next_url = None
+    if next_link is not None and next_link.get('href'):
+        next_url = urljoin(base_url, next_link['href'])
+
+    return {'cards': cards, 'next_url': next_url}
+
+
+def parse_resume_details(html: str) -> Optional[str]:
+    """Return the text of the resume details panel from a page_source snapshot"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, PARSER)
+    return _text(soup.select_one(SELECTORS['resume_details']), separator='\n')
@@ -0,0 +1,223 @@
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class JobQueue(SQLiteStore):
+    """SQLite-backed scrape job queue served by a bounded pool of worker threads"""
+
+    def __init__(self, db_path: str, handler: Callable[[Dict, 'JobQueue'], Optional[Dict]],
+                 max_workers: int = 2, poll_interval: float = 5.0):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._stopping = False
+
+        SQLiteStore.__init__(self, db_path)
+        self._requeue_interrupted()
+
+    def _create_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL DEFAULT 'search',
+                status TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                processed INTEGER NOT NULL DEFAULT 0,
+                total INTEGER,
+                output TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+        if 'kind' not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN kind TEXT NOT NULL DEFAULT 'search'")
+            # Batch jobs used to be marked inside their filters
+            conn.execute("UPDATE jobs SET kind = 'batch' WHERE json_extract(filters, '$.kind') = 'batch'")
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            )
+        ''')
+
+    def _requeue_interrupted(self):
+        """Put jobs that were running when the process died back on the queue
+
+        Their results and progress are kept; the handler resumes from its checkpoint and
+        calls truncate_results to drop anything stored after it.
+        """
+        with self._connect() as conn:
+            interrupted = [row['id'] for row in conn.execute(
+                'SELECT id FROM jobs WHERE status = ?', (RUNNING,)
+            )]
+            for job_id in interrupted:
+                conn.execute('UPDATE jobs SET status = ? WHERE id = ?', (QUEUED, job_id))
+        if interrupted:
+            logger.info(f"Re-queued {len(interrupted)} interrupted job(s)")
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'scrape-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Job queue started with {self.max_workers} worker(s)")
+
+    def stop(self):
+        """Ask the workers to exit once their current job is finished"""
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def enqueue(self, filters: Dict, kind: str = 'search') -> str:
+        """Add a job to the queue and return its ID
+
+        kind is set by the server, never taken from the request, and tells the handler
+        how to read the filters.
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, status, filters, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, json.dumps(filters), datetime.now().isoformat())
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        logger.info(f"Enqueued job {job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job's status and progress, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_job(row)
+
+    def get_results(self, job_id: str, offset: int = 0) -> List[Dict]:
+        """Return the records a job has produced so far, starting at offset"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT record FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq',
+                (job_id, offset)
+            ).fetchall()
+        return [json.loads(row['record']) for row in rows]
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (QUEUED,)).fetchone()[0]
+
+    def append_result(self, job_id: str, record: Dict):
+        """Store a record produced by a running job"""
+        with self._connect() as conn:
+            seq = conn.execute(
+                'SELECT COUNT(*) FROM job_results WHERE job_id = ?', (job_id,)
+            ).fetchone()[0]
+            conn.execute(
+                'INSERT INTO job_results (job_id, seq, record) VALUES (?, ?, ?)',
+                (job_id, seq, json.dumps(record))
+            )
+
+    def truncate_results(self, job_id: str, keep: int):
+        """Drop a job's records beyond the first keep, e.g. ones stored after its last checkpoint"""
+        with self._connect() as conn:
+            dropped = conn.execute(
+                'DELETE FROM job_results WHERE job_id = ? AND seq >= ?', (job_id, keep)
+            ).rowcount
+        if dropped:
+            logger.info(f"Dropped {dropped} result(s) of job {job_id} past its checkpoint")
+
+    def update_progress(self, job_id: str, processed: int, total: Optional[int] = None):
+        """Record how many cards a running job has processed"""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET processed = ?, total = COALESCE(?, total) WHERE id = ?',
+                (processed, total, job_id)
+            )
+
+    def _claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest queued job to running"""
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    'SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                claimed = conn.execute(
+                    'UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?',
+                    (RUNNING, datetime.now().isoformat(), row['id'], QUEUED)
+                ).rowcount
+                conn.commit()
+                if claimed:
+                    return self._row_to_job(row)
+
+    def _finish(self, job_id: str, status: str, output: Optional[Dict] = None, error: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, output = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, json.dumps(output) if output is not None else None, error,
+                 datetime.now().isoformat(), job_id)
+            )
+
+    def _worker_loop(self):
+        while not self._stopping:
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error(f"Failed to claim job: {str(e)}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            logger.info(f"Starting job {job['id']}")
+            try:
+                output = self.handler(job, self)
+                self._finish(job['id'], COMPLETED, output=output)
+                logger.info(f"Job {job['id']} completed")
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {str(e)}")
+                self._finish(job['id'], FAILED, error=str(e))
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'filters': json.loads(row['filters']),
+            'progress': {
+                'processed': row['processed'],
+                'total': row['total']
+            },
+            'output': json.loads(row['output']) if row['output'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
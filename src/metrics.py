@@ -0,0 +1,129 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+STAGE_SECONDS = Histogram(
+    'scraper_stage_seconds',
+    'Time spent in each scraping stage',
+    ['stage'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+)
+CARDS_PER_SECOND = Histogram(
+    'scraper_cards_per_second',
+    'Resume cards processed per second, per job',
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5)
+)
+DOWNLOAD_BYTES = Histogram(
+    'scraper_download_bytes',
+    'Size of downloaded resume files',
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+)
+STAGE_FAILURES = Counter(
+    'scraper_stage_failures_total',
+    'Stages that failed or raised',
+    ['stage']
+)
+PAGE_BYTES = Histogram(
+    'scraper_page_bytes',
+    'Bytes transferred to load a page and its subresources',
+    ['page', 'mode'],
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+)
+PAGE_LOAD_SECONDS = Histogram(
+    'scraper_page_load_seconds',
+    'Time from navigation start to DOMContentLoaded',
+    ['page', 'mode'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20)
+)
+WAIT_SECONDS = Histogram(
+    'scraper_wait_seconds',
+    'Time spent waiting for an element, by wait and outcome',
+    ['wait', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30)
+)
+UPLOAD_SECONDS = Histogram(
+    'scraper_upload_seconds',
+    'Time to upload a file to Drive or append a batch of rows to Sheets',
+    ['kind'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+UPLOAD_FAILURES = Counter(
+    'scraper_upload_failures_total',
+    'Failed Drive or Sheets requests, including ones that are retried',
+    ['kind']
+)
+ACTIVE_DRIVERS = Gauge('scraper_active_drivers', 'Chrome drivers currently running')
+QUEUE_DEPTH = Gauge('scraper_queue_depth', 'Jobs waiting for a worker')
+UPLOAD_QUEUE_DEPTH = Gauge('scraper_upload_queue_depth', 'Files and rows waiting to be uploaded')
+
+
+class Span:
+    """Handle for a running stage; call fail() when a stage reports failure without raising"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+
+class JobTimer:
+    """Per-job totals of the time spent in each stage"""
+
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self._stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, failed: bool = False):
+        with self._lock:
+            totals = self._stages.setdefault(
+                stage, {'count': 0, 'failures': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+            )
+            totals['count'] += 1
+            totals['failures'] += int(failed)
+            totals['total_seconds'] += seconds
+            totals['max_seconds'] = max(totals['max_seconds'], seconds)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Stage totals rounded for a JSON response"""
+        with self._lock:
+            return {
+                stage: {
+                    'count': totals['count'],
+                    'failures': totals['failures'],
+                    'total_seconds': round(totals['total_seconds'], 3),
+                    'avg_seconds': round(totals['total_seconds'] / totals['count'], 3),
+                    'max_seconds': round(totals['max_seconds'], 3)
+                }
+                for stage, totals in self._stages.items()
+            }
+
+
+@contextmanager
+def timed_stage(stage: str, timer: Optional[JobTimer] = None):
+    """Time a stage, feeding the Prometheus histograms, the job's timer and a structured log line"""
+    span = Span(stage)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception:
+        span.fail()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        if span.failed:
+            STAGE_FAILURES.labels(stage).inc()
+        if timer is not None:
+            timer.record(stage, elapsed, span.failed)
+        job_id = timer.job_id if timer is not None else None
+        logger.info(
+            f"stage={stage} job_id={job_id} seconds={elapsed:.3f} status={'failed' if span.failed else 'ok'}"
+        )
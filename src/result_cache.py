@@ -0,0 +1,91 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from job_queue import JobQueue, QUEUED, RUNNING, COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# Request fields that change what a scrape returns, or where its uploads go
+CACHE_KEY_FIELDS = (
+    'keywords', 'location', 'experience_years', 'education', 'max_results', 'source', 'freshness_hours',
+    'storage', 'drive_folder_id', 'output_format', 'spreadsheet_id'
+)
+
+# Google Drive and Sheets IDs are case-sensitive
+CASE_SENSITIVE_FIELDS = {'drive_folder_id', 'spreadsheet_id'}
+
+# Compared by value, so 5, "5" and 5.0 are the same search
+NUMERIC_FIELDS = {'experience_years': int, 'max_results': int, 'freshness_hours': float}
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return ' '.join(value.lower().split())
+    return value
+
+
+def cache_key(filters: Dict) -> str:
+    """Identical searches map to the same key regardless of case, spacing or field order"""
+    normalized = {}
+    for field in CACHE_KEY_FIELDS:
+        value = filters.get(field)
+        if field not in CASE_SENSITIVE_FIELDS:
+            value = _normalize(value)
+        if field in NUMERIC_FIELDS and value not in (None, ''):
+            try:
+                value = NUMERIC_FIELDS[field](value)
+            except (TypeError, ValueError):
+                pass
+        if value not in (None, ''):
+            normalized[field] = value
+    return json.dumps(normalized, sort_keys=True)
+
+
+class ResultCache:
+    """LRU map from normalized filters to the job that answered them
+
+    A request whose job is still queued or running is coalesced onto that job, and a
+    request whose job completed less than ttl_seconds ago reuses its results. Anything
+    else, including failed jobs, starts a new job.
+    """
+
+    def __init__(self, job_queue: JobQueue, ttl_seconds: float = 3600, max_entries: int = 256):
+        self.job_queue = job_queue
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_enqueue(self, filters: Dict, enqueue: Callable[[Dict], str]) -> Tuple[str, Dict]:
+        """Return (job_id, cache_info) for a request, starting a job only on a miss"""
+        key = cache_key(filters)
+        # Held across lookup and enqueue so concurrent identical requests cannot both miss
+        with self._lock:
+            job_id = self._entries.get(key)
+            job = self.job_queue.get(job_id) if job_id else None
+            info = self._lookup(job)
+            if info is not None:
+                self._entries.move_to_end(key)
+                logger.info(f"Cache hit for {key} -> job {job_id}")
+                return job_id, info
+
+            job_id = enqueue(filters)
+            self._entries[key] = job_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return job_id, {'hit': False, 'in_flight': False, 'age_seconds': None}
+
+    def _lookup(self, job: Optional[Dict]) -> Optional[Dict]:
+        if job is None:
+            return None
+        if job['status'] in (QUEUED, RUNNING):
+            return {'hit': True, 'in_flight': True, 'age_seconds': None}
+        if job['status'] == COMPLETED and job['finished_at']:
+            age = (datetime.now() - datetime.fromisoformat(job['finished_at'])).total_seconds()
+            if age <= self.ttl_seconds:
+                return {'hit': True, 'in_flight': False, 'age_seconds': round(age, 1)}
+        return None
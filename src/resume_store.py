@@ -0,0 +1,143 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Filter fields that identify a search, in the order they are recorded as the source query
+QUERY_FIELDS = ('keywords', 'location', 'experience_years', 'education')
+
+
+def candidate_key(record: Dict) -> Optional[str]:
+    """Key a candidate by Indeed's resume ID, falling back to name plus location"""
+    if record.get('candidate_id'):
+        return f"id:{record['candidate_id']}"
+    if record.get('name'):
+        return f"name:{record['name'].strip().lower()}|{(record.get('location') or '').strip().lower()}"
+    return None
+
+
+def source_query(filters: Dict) -> str:
+    """Canonical JSON form of the search that found a candidate"""
+    return json.dumps({field: filters[field] for field in QUERY_FIELDS if field in filters}, sort_keys=True)
+
+
+def hash_file(path: str) -> str:
+    """sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResumeStore(SQLiteStore):
+    """Content-addressed resume files with a SQLite index of the candidates they belong to"""
+
+    def __init__(self, root: str, db_path: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        SQLiteStore.__init__(self, db_path)
+
+    def _create_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS candidates (
+                candidate_key TEXT PRIMARY KEY,
+                candidate_id TEXT,
+                name TEXT,
+                location TEXT,
+                email TEXT,
+                phone TEXT,
+                profile_url TEXT,
+                resume_sha256 TEXT,
+                source_query TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        ''')
+
+    def path_for(self, sha256: str, extension: str = '.pdf') -> str:
+        """Fanned-out location of a file in the store, e.g. ab/cd/abcd1234....pdf"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f'{sha256}{extension}')
+
+    def put_file(self, path: str) -> Tuple[str, str]:
+        """Move a downloaded file into the store, dropping it if the content is already there
+
+        Returns (sha256, stored_path).
+        """
+        sha256 = hash_file(path)
+        extension = os.path.splitext(path)[1].lower() or '.pdf'
+        stored_path = self.path_for(sha256, extension)
+
+        if os.path.exists(stored_path):
+            os.remove(path)
+            logger.debug(f"Resume {sha256[:12]} already stored")
+        else:
+            os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+            shutil.move(path, stored_path)
+
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO files (sha256, path, size, created_at) VALUES (?, ?, ?, ?)',
+                (sha256, stored_path, os.path.getsize(stored_path), datetime.now().isoformat())
+            )
+        return sha256, stored_path
+
+    def upsert_candidate(self, record: Dict, query: Optional[str] = None):
+        """Insert a candidate or refresh their details and last_seen time"""
+        key = candidate_key(record)
+        if key is None:
+            return
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO candidates (
+                    candidate_key, candidate_id, name, location, email, phone, profile_url,
+                    resume_sha256, source_query, first_seen, last_seen
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (candidate_key) DO UPDATE SET
+                    name = COALESCE(excluded.name, name),
+                    location = COALESCE(excluded.location, location),
+                    email = COALESCE(excluded.email, email),
+                    phone = COALESCE(excluded.phone, phone),
+                    profile_url = COALESCE(excluded.profile_url, profile_url),
+                    resume_sha256 = COALESCE(excluded.resume_sha256, resume_sha256),
+                    source_query = COALESCE(excluded.source_query, source_query),
+                    last_seen = excluded.last_seen
+            ''', (
+                key, record.get('candidate_id'), record.get('name'), record.get('location'),
+                record.get('email'), record.get('phone'), record.get('profile_url'),
+                record.get('resume_sha256'), query, now, now
+            ))
+
+    def seen_within(self, key: Optional[str], hours: float) -> bool:
+        """Whether a candidate was captured in the last `hours` hours"""
+        if key is None or hours <= 0:
+            return False
+        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT 1 FROM candidates WHERE candidate_key = ? AND last_seen >= ?', (key, cutoff)
+            ).fetchone()
+        return row is not None
+
+    def get_candidate(self, key: str) -> Optional[Dict]:
+        """Look up a candidate by candidate_key"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM candidates WHERE candidate_key = ?', (key,)).fetchone()
+        return dict(row) if row else None
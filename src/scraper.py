@@ -3,39 +3,93 @@ import time
 import json
 import logging
 import random
-from typing import Dict, List, Optional
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
+import shutil
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from extraction import parse_search_page, parse_resume_details
+from export import CsvResultWriter
+from contacts import extract_contacts
+from metrics import ACTIVE_DRIVERS, DOWNLOAD_BYTES, PAGE_BYTES, PAGE_LOAD_SECONDS, JobTimer, timed_stage
+from resource_policy import LIGHTWEIGHT_PREFS, apply_resource_policy, page_weight
+from waits import CLICKABLE, XPATH, find_optional, is_present, locator_for, wait_any, wait_for
+from downloads import list_downloads, wait_for_download
+from resume_store import ResumeStore, candidate_key, source_query
+from checkpoint import CheckpointJournal
 from dotenv import load_dotenv
-import re
-import requests
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class SessionLostError(RuntimeError):
+    """The browser died or was signed out partway through a search"""
+
+
+def is_verification_url(url: str) -> bool:
+    """Whether a URL is a verification or CAPTCHA challenge page"""
+    url = url.lower()
+    return 'verify' in url or 'captcha' in url
+
+
 class IndeedResumeScraper:
-    def __init__(self):
+    def __init__(self, download_dir: Optional[str] = None, resume_store: Optional[ResumeStore] = None):
         load_dotenv()
         self.indeed_email = os.getenv('INDEED_EMAIL')
         self.indeed_password = os.getenv('INDEED_PASSWORD')
+        # Overridable so the scraper can be pointed at the offline fixture site
+        self.base_url = os.getenv('INDEED_BASE_URL', 'https://www.indeed.com').rstrip('/')
+        self.login_url = os.getenv('INDEED_LOGIN_URL', 'https://secure.indeed.com/account/login')
+        self.headless = os.getenv('CHROME_HEADLESS', '').lower() in ('1', 'true', 'yes')
+        # Block images, fonts, media and trackers on the pages we only read the DOM of
+        self.lightweight_pages = os.getenv('LIGHTWEIGHT_PAGES', '').lower() in ('1', 'true', 'yes')
+        self.downloads_dir = os.path.join(os.getcwd(), 'downloads')
+        # Chrome downloads into a directory owned by this session so concurrent sessions never share files
+        self.download_dir = download_dir or os.path.join(self.downloads_dir, '.incoming', uuid.uuid4().hex[:12])
+        self.download_timeout = float(os.getenv('DOWNLOAD_TIMEOUT', 60))
+        self.resume_store = resume_store
+        # Candidates captured within this many hours are skipped before their detail page is opened
+        self.freshness_hours = float(os.getenv('FRESHNESS_HOURS', 24))
+        self.last_run_stats = {'new': 0, 'skipped': 0}
+        # Calling code assumed for phone numbers written without one
+        self.default_country_code = os.getenv('DEFAULT_COUNTRY_CODE', '1')
         self.driver = None
-        self.setup_driver()
+        self.pages_loaded = 0
+        # Bytes and load time per page type, summed over this session
+        self.page_totals: Dict[str, Dict[str, float]] = {}
+        # Set per job so stage timings are attributed to it
+        self.timer: Optional[JobTimer] = None
+        # Chrome is started by the first navigation, so constructing a scraper is cheap
+
+    def ensure_driver(self):
+        """Start Chrome if this scraper has no driver yet
+
+        navigate() and login() call this as a fallback; callers that time the session
+        stages should call it first so driver_startup is not nested inside them.
+        """
+        if self.driver is None:
+            self.setup_driver()
 
     def random_delay(self, min_seconds=1, max_seconds=3):
         """Add random delay to appear more human-like"""
         time.sleep(random.uniform(min_seconds, max_seconds))
 
+    def _stage(self, stage: str):
+        """Time a stage of the pipeline for the current job"""
+        return timed_stage(stage, self.timer)
+
     def setup_driver(self):
+        """Initialize headless Chrome driver, timed as the driver_startup stage"""
+        with self._stage('driver_startup'):
+            self._start_driver()
+        ACTIVE_DRIVERS.inc()
+
+    def _start_driver(self):
         """Initialize headless Chrome driver with anti-detection measures"""
+        # Imported here so that importing the scraper, e.g. by the web server, does not load selenium
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
         try:
             chrome_options = Options()
             
@@ -53,18 +107,38 @@ class IndeedResumeScraper:
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-gpu')
+            if self.headless:
+                chrome_options.add_argument('--headless=new')
             chrome_options.add_argument('--window-size=1920,1080')
             
             # Add experimental options
             chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
+            # Download straight into this session's directory without prompting or opening PDFs
+            os.makedirs(self.download_dir, exist_ok=True)
+            prefs = {
+                'download.default_directory': self.download_dir,
+                'download.prompt_for_download': False,
+                'download.directory_upgrade': True,
+                'plugins.always_open_pdf_externally': True
+            }
+            if self.lightweight_pages:
+                prefs.update(LIGHTWEIGHT_PREFS)
+            chrome_options.add_experimental_option('prefs', prefs)
+            
             # Initialize driver
             self.driver = webdriver.Chrome(options=chrome_options)
             
             # Set window size
             self.driver.set_window_size(1920, 1080)
             
+            # Prefs are ignored by headless Chrome, so also set the download path over CDP
+            self.driver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+                'behavior': 'allow',
+                'downloadPath': self.download_dir
+            })
+            
             # Add additional headers
             self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
                 "userAgent": random.choice(user_agents)
@@ -86,12 +160,143 @@ class IndeedResumeScraper:
                 }
             })
             
-            self.driver.implicitly_wait(10)
+            # Images and fonts are only blocked once the session is signed in, see block_assets
+            if self.lightweight_pages:
+                apply_resource_policy(self.driver, assets=False)
+            
+            # Every lookup states its own timeout in waits.py; an implicit wait would make
+            # each probe for an absent element stall for the full period
+            self.driver.implicitly_wait(0)
             
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {str(e)}")
             raise
 
+    def navigate(self, url: str):
+        """Load a page and count it towards the session's page budget"""
+        self.ensure_driver()
+        self.driver.get(url)
+        self.pages_loaded += 1
+
+    def record_page_weight(self, page: str):
+        """Report bytes transferred and DOMContentLoaded time of the current page, labelled by page type"""
+        weight = page_weight(self.driver)
+        if not weight:
+            return
+        mode = 'light' if self.lightweight_pages else 'full'
+        PAGE_BYTES.labels(page, mode).observe(weight['bytes'])
+        totals = self.page_totals.setdefault(page, {'count': 0, 'bytes': 0, 'load_seconds': 0.0})
+        totals['count'] += 1
+        totals['bytes'] += weight['bytes']
+        if weight['dom_ready_ms'] is not None:
+            PAGE_LOAD_SECONDS.labels(page, mode).observe(weight['dom_ready_ms'] / 1000)
+            totals['load_seconds'] += weight['dom_ready_ms'] / 1000
+        logger.debug(
+            f"page={page} mode={mode} bytes={weight['bytes']} requests={weight['requests']} "
+            f"dom_ready_ms={weight['dom_ready_ms']}"
+        )
+
+    def block_assets(self, blocked: bool = True):
+        """In lightweight mode, block or allow images, fonts and media (trackers stay blocked)"""
+        if self.lightweight_pages and self.driver is not None:
+            apply_resource_policy(self.driver, assets=blocked)
+
+    def on_verification_page(self) -> bool:
+        """Whether the current page is a verification or CAPTCHA challenge"""
+        try:
+            return is_verification_url(self.driver.current_url)
+        except Exception:
+            return False
+
+    def is_logged_in(self) -> bool:
+        """Check whether the current page shows the signed-in account menu"""
+        return is_present(self.driver, 'account_menu')
+
+    def session_lost(self) -> bool:
+        """Whether the driver has died or been sent back to the login page"""
+        try:
+            current_url = self.driver.current_url
+        except Exception:
+            return True
+        if is_verification_url(current_url):
+            # A challenge mid-search needs its images to be solvable
+            logger.warning("Verification page shown during search")
+            self.block_assets(False)
+            return True
+        return current_url.startswith(self.login_url) or '/account/login' in current_url
+
+    def wait_for_login_state(self) -> bool:
+        """After a page load, wait until the header shows either the account menu or a sign-in link"""
+        return wait_any(self.driver, ['account_menu', 'sign_in_button'], 'login_state') == 'account_menu'
+
+    def save_cookies(self, path: str):
+        """Persist the session cookies so a new driver can skip the login flow"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.driver.get_cookies(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save cookies: {str(e)}")
+
+    def restore_session(self, path: str) -> bool:
+        """Load saved cookies into the driver and check that they are still logged in"""
+        with self._stage('session_restore') as span:
+            restored = self._restore_session(path)
+            if not restored:
+                span.fail()
+        if restored:
+            self.block_assets()
+        return restored
+
+    def _restore_session(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                cookies = json.load(f)
+
+            # Cookies can only be set for the domain that is currently loaded
+            self.navigate(self.base_url)
+            for cookie in cookies:
+                cookie.pop('sameSite', None)
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+            self.navigate(self.base_url)
+
+            if self.wait_for_login_state():
+                logger.info("Restored Indeed session from saved cookies")
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to restore session from cookies: {str(e)}")
+        return False
+
+    def memory_usage_mb(self) -> Optional[float]:
+        """Resident memory of chromedriver and the browser processes it started, in MB (Linux only)"""
+        try:
+            pending = [self.driver.service.process.pid]
+        except AttributeError:
+            return None
+
+        total_kb = 0
+        while pending:
+            pid = pending.pop()
+            try:
+                with open(f'/proc/{pid}/status') as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            total_kb += int(line.split()[1])
+                            break
+                for task in os.listdir(f'/proc/{pid}/task'):
+                    with open(f'/proc/{pid}/task/{task}/children') as f:
+                        pending.extend(int(child) for child in f.read().split())
+            except OSError:
+                continue
+        return total_kb / 1024
+
     def wait_for_manual_verification(self, timeout=300):
         """Wait for manual verification to be completed"""
         logger.info("Waiting for manual verification...")
@@ -100,22 +305,21 @@ class IndeedResumeScraper:
         while time.time() - start_time < timeout:
             try:
                 # Check if we're still on a verification page
-                if "verify" in self.driver.current_url.lower() or "captcha" in self.driver.current_url.lower():
+                if self.on_verification_page():
                     logger.info("Still on verification page. Please complete the verification...")
                     time.sleep(5)
                     continue
                     
-                # Check if we're logged in
-                if len(self.driver.find_elements(By.CSS_SELECTOR, '[data-tn-component="auth-header-account-menu"]')) > 0:
+                # Race the signed-in menu against an error message instead of sleeping between checks
+                matched = wait_any(self.driver, ['account_menu', 'verification_error'], 'verification_result')
+                if matched == 'account_menu':
                     logger.info("Verification completed successfully!")
                     return True
-                    
-                # Check for error messages
-                error_elements = self.driver.find_elements(By.CSS_SELECTOR, '.error-message, .errorlist')
-                if error_elements:
-                    error_text = error_elements[0].text
+                if matched == 'verification_error':
+                    error_text = self.driver.find_element(*locator_for('verification_error')).text
                     logger.error(f"Error during verification: {error_text}")
                     return False
+                continue
                     
             except Exception as e:
                 logger.error(f"Error while waiting for verification: {str(e)}")
@@ -126,6 +330,19 @@ class IndeedResumeScraper:
         return False
 
     def login(self):
+        """Login to Indeed Resume, timed as the login stage"""
+        self.ensure_driver()
+        # Sign-in and CAPTCHA widgets need their images and fonts
+        self.block_assets(False)
+        with self._stage('login') as span:
+            logged_in = self._login()
+            if not logged_in:
+                span.fail()
+        if logged_in:
+            self.block_assets()
+        return logged_in
+
+    def _login(self):
         """Login to Indeed Resume with anti-detection measures and verification handling"""
         try:
             if not self.indeed_email or not self.indeed_password:
@@ -134,15 +351,13 @@ class IndeedResumeScraper:
 
             # First visit Indeed homepage to get cookies
             logger.info("Visiting Indeed homepage...")
-            self.driver.get('https://www.indeed.com')
+            self.navigate(self.base_url)
             self.random_delay(2, 4)
             
             # Click sign in with a more natural approach
             logger.info("Looking for sign in button...")
             try:
-                sign_in_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-gnav-element-name="SignIn"]'))
-                )
+                sign_in_button = wait_for(self.driver, 'sign_in_button', CLICKABLE)
                 # Move to element and click with random delay
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", sign_in_button)
                 self.random_delay()
@@ -150,16 +365,14 @@ class IndeedResumeScraper:
             except:
                 # Try alternative sign in URL
                 logger.info("Trying direct sign in URL...")
-                self.driver.get('https://secure.indeed.com/account/login')
+                self.navigate(self.login_url)
             
             self.random_delay(2, 4)
             
             # Enter email with human-like behavior
             logger.info("Entering email...")
             try:
-                email_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.ID, 'login-email-input'))
-                )
+                email_input = wait_for(self.driver, 'email_input')
                 # Type email with random delays between characters
                 for char in self.indeed_email:
                     email_input.send_keys(char)
@@ -174,9 +387,7 @@ class IndeedResumeScraper:
             # Enter password with human-like behavior
             logger.info("Entering password...")
             try:
-                password_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.ID, 'login-password-input'))
-                )
+                password_input = wait_for(self.driver, 'password_input')
                 # Type password with random delays between characters
                 for char in self.indeed_password:
                     password_input.send_keys(char)
@@ -191,9 +402,7 @@ class IndeedResumeScraper:
             # Click sign in button
             logger.info("Clicking sign in button...")
             try:
-                submit_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, 'login-submit-button'))
-                )
+                submit_button = wait_for(self.driver, 'submit_button', CLICKABLE)
                 # Move to element and click with random delay
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_button)
                 self.random_delay()
@@ -220,21 +429,18 @@ class IndeedResumeScraper:
             # Check if login was successful
             try:
                 logger.info("Checking login status...")
-                WebDriverWait(self.driver, 20).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-tn-component="auth-header-account-menu"]')),
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '.error-message'))
-                    )
-                )
+                matched = wait_any(self.driver, ['account_menu', 'login_error'], 'login_result')
+                if matched is None:
+                    raise TimeoutError('Neither the account menu nor a login error appeared')
                 
                 # Check if we're logged in
-                if len(self.driver.find_elements(By.CSS_SELECTOR, '[data-tn-component="auth-header-account-menu"]')) > 0:
+                if matched == 'account_menu':
                     logger.info("Successfully logged in to Indeed")
                     
                     # Navigate to resume search with random delay
                     self.random_delay(2, 4)
                     logger.info("Navigating to resume search...")
-                    self.driver.get('https://www.indeed.com/resumes/search')
+                    self.navigate(f'{self.base_url}/resumes/search')
                     self.random_delay(3, 5)
                     
                     # Verify we're on the resume search page
@@ -263,20 +469,159 @@ class IndeedResumeScraper:
             self.driver.save_screenshot('general_error.png')
             return False
 
-    def search_resumes(self, filters: Dict) -> List[Dict]:
-        """Search resumes with given filters"""
+    def search_resumes(self, filters: Dict,
+                       progress_callback: Optional[Callable[[Dict, int, Optional[int]], None]] = None,
+                       max_results: Optional[int] = None) -> List[Dict]:
+        """Search resumes with given filters
+
+        progress_callback, if given, is called as (record, processed, max_results) after each card.
+        """
+        results = []
+        for record in self.iter_resumes(filters, max_results=max_results):
+            results.append(record)
+            if progress_callback:
+                progress_callback(record, len(results), max_results)
+        return results
+
+    def iter_resumes(self, filters: Dict, max_results: Optional[int] = None,
+                     freshness_hours: Optional[float] = None,
+                     skip_candidate: Optional[Callable[[Dict], bool]] = None,
+                     checkpoint: Optional[CheckpointJournal] = None) -> Iterator[Dict]:
+        """Yield candidate records as they are scraped, following pagination lazily
+
+        Stops after max_results records, when a page has no cards that were not already
+        seen, or when there is no next page. Candidates the resume store captured within
+        freshness_hours (default FRESHNESS_HOURS, 0 disables) are skipped, as are cards for
+        which skip_candidate returns True. Counts of new and skipped candidates are kept in
+        last_run_stats.
+
+        With a checkpoint journal, each results page and each card the caller has finished
+        with is journalled, and a journal that already has progress is resumed: its last
+        results page is reopened, its cards are not scraped again and count towards
+        max_results. Raises SessionLostError if the browser dies or is signed out, so the
+        caller can retry on a fresh session.
+        """
+        if freshness_hours is None:
+            freshness_hours = self.freshness_hours
+        self.last_run_stats = {'new': 0, 'skipped': 0}
+        state = checkpoint.load() if checkpoint else None
+        processed = state.processed if state else set()
+        if max_results and len(processed) >= max_results:
+            return
+
+        if state and state.page_url:
+            logger.info(f"Resuming search at page {state.page_number} with {len(processed)} cards already done")
+            page_number = state.page_number
+            try:
+                self.navigate(state.page_url)
+            except Exception as e:
+                if self.session_lost():
+                    raise SessionLostError(f'Browser session lost reopening results page {page_number}') from e
+                raise
+        else:
+            page_number = 1
+            with self._stage('search') as span:
+                submitted = self._submit_search(filters)
+                if not submitted:
+                    span.fail()
+            if not submitted:
+                if self.session_lost():
+                    raise SessionLostError('Browser session lost while submitting the search')
+                return
+
+        query = source_query(filters)
+        seen = set()
+        try:
+            while True:
+                try:
+                    with self._stage('search_page'):
+                        # Wait for results to load
+                        wait_for(self.driver, 'resume_card')
+                        # Collect every card's detail URL up front so the results page is never reloaded
+                        page = parse_search_page(self.driver.page_source, base_url=self.driver.current_url)
+                    self.record_page_weight('results')
+                except Exception as e:
+                    if self.session_lost():
+                        raise SessionLostError(f'Browser session lost on results page {page_number}') from e
+                    logger.error(f"Failed to collect search results on page {page_number}: {str(e)}")
+                    return
+                if checkpoint:
+                    checkpoint.record_page(page_number, self.driver.current_url)
+
+                new_cards = []
+                for card in page['cards']:
+                    key = card['candidate_id'] or card['url'] or card['name']
+                    if key not in seen:
+                        seen.add(key)
+                        new_cards.append(card)
+                if not new_cards:
+                    logger.info(f"No new resume cards on page {page_number}, stopping")
+                    return
+                logger.info(f"Page {page_number}: {len(new_cards)} new resume cards")
+
+                for card in new_cards:
+                    if not card['url']:
+                        logger.warning(f"Resume card for {card['name']} has no detail link, skipping")
+                        continue
+                    if candidate_key(card) in processed:
+                        continue
+                    # Before the freshness lookup, which would also catch a candidate this
+                    # job has just stored and hide it from skip_candidate
+                    if skip_candidate and skip_candidate(card):
+                        self.last_run_stats['skipped'] += 1
+                        continue
+                    if self.resume_store and self.resume_store.seen_within(candidate_key(card), freshness_hours):
+                        self.last_run_stats['skipped'] += 1
+                        continue
+                    try:
+                        with self._stage('detail'):
+                            record = self._scrape_resume_details(card)
+                    except Exception as e:
+                        if self.session_lost():
+                            raise SessionLostError(f'Browser session lost on the resume of {card["name"]}') from e
+                        logger.warning(f"Failed to process resume card: {str(e)}")
+                        continue
+
+                    yield record
+                    # Journalled only once the caller asks for the next record, i.e. has stored this one.
+                    # The store is updated after the journal: if the process dies in between, a resumed
+                    # job keeps the record, instead of dropping it and then skipping the candidate as
+                    # recently captured.
+                    if checkpoint:
+                        checkpoint.record_card(candidate_key(card), record)
+                    if self.resume_store:
+                        self.resume_store.upsert_candidate(record, query=query)
+                    self.last_run_stats['new'] += 1
+                    if max_results and len(processed) + self.last_run_stats['new'] >= max_results:
+                        return
+
+                if not page['next_url']:
+                    return
+                page_number += 1
+                try:
+                    self.navigate(page['next_url'])
+                except Exception as e:
+                    if self.session_lost():
+                        raise SessionLostError(f'Browser session lost opening results page {page_number}') from e
+                    raise
+        finally:
+            logger.info(
+                f"Search finished: {self.last_run_stats['new']} new, "
+                f"{self.last_run_stats['skipped']} skipped as recently captured"
+            )
+
+    def _submit_search(self, filters: Dict) -> bool:
+        """Fill in and submit the resume search form"""
         try:
             # Navigate to resume search
-            self.driver.get('https://www.indeed.com/resumes')
+            self.navigate(f'{self.base_url}/resumes')
             
             # Enter search keywords
-            search_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-tn-element="resume-search-input"]'))
-            )
+            search_input = wait_for(self.driver, 'search_input')
             search_input.send_keys(filters['keywords'])
             
             # Enter location
-            location_input = self.driver.find_element(By.CSS_SELECTOR, '[data-tn-element="resume-location-input"]')
+            location_input = wait_for(self.driver, 'location_input')
             location_input.send_keys(filters['location'])
             
             # Apply additional filters if provided
@@ -286,25 +631,28 @@ class IndeedResumeScraper:
                 self._apply_education_filter(filters['education'])
             
             # Click search
-            search_button = self.driver.find_element(By.CSS_SELECTOR, '[data-tn-element="resume-search-button"]')
+            search_button = wait_for(self.driver, 'search_button', CLICKABLE)
             search_button.click()
-            
-            # Wait for results and collect data
-            return self._collect_search_results()
+            self.pages_loaded += 1
+            return True
             
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
-            return []
+            return False
 
     def _apply_experience_filter(self, years: int):
         """Apply experience filter"""
         try:
-            experience_button = self.driver.find_element(By.CSS_SELECTOR, '[data-tn-element="experience-filter"]')
+            experience_button = find_optional(self.driver, 'experience_filter', CLICKABLE)
+            if experience_button is None:
+                logger.warning("Experience filter not available on this page")
+                return
             experience_button.click()
             
             # Select appropriate experience range
-            experience_option = self.driver.find_element(
-                By.XPATH, f"//div[contains(text(), '{years}+ years')]"
+            experience_option = wait_for(
+                self.driver, 'filter_option', CLICKABLE,
+                locator=(XPATH, f"//div[contains(text(), '{years}+ years')]")
             )
             experience_option.click()
         except Exception as e:
@@ -313,129 +661,106 @@ class IndeedResumeScraper:
     def _apply_education_filter(self, education: str):
         """Apply education filter"""
         try:
-            education_button = self.driver.find_element(By.CSS_SELECTOR, '[data-tn-element="education-filter"]')
+            education_button = find_optional(self.driver, 'education_filter', CLICKABLE)
+            if education_button is None:
+                logger.warning("Education filter not available on this page")
+                return
             education_button.click()
             
             # Select education level
-            education_option = self.driver.find_element(
-                By.XPATH, f"//div[contains(text(), '{education}')]"
+            education_option = wait_for(
+                self.driver, 'filter_option', CLICKABLE,
+                locator=(XPATH, f"//div[contains(text(), '{education}')]")
             )
             education_option.click()
         except Exception as e:
             logger.warning(f"Failed to apply education filter: {str(e)}")
 
-    def _collect_search_results(self) -> List[Dict]:
-        """Collect search results and extract candidate information"""
-        results = []
-        try:
-            # Wait for results to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.resume-card'))
-            )
-            
-            # Get all resume cards
-            resume_cards = self.driver.find_elements(By.CSS_SELECTOR, '.resume-card')
-            
-            for card in resume_cards:
-                try:
-                    # Extract basic information
-                    name = card.find_element(By.CSS_SELECTOR, '.resume-name').text
-                    
-                    # Click to view full resume
-                    card.click()
-                    
-                    # Wait for resume details to load
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '.resume-details'))
-                    )
-                    
-                    # Extract contact information
-                    contact_info = self._extract_contact_info()
-                    
-                    # Download resume
-                    resume_path = self._download_resume(name)
-                    
-                    results.append({
-                        'name': name,
-                        'email': contact_info.get('email'),
-                        'phone': contact_info.get('phone'),
-                        'resume_path': resume_path,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                    # Go back to search results
-                    self.driver.back()
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to process resume card: {str(e)}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Failed to collect search results: {str(e)}")
+    def _scrape_resume_details(self, card: Dict) -> Dict:
+        """Open a candidate's resume page directly and build their record"""
+        self.navigate(card['url'])
         
-        return results
+        # Wait for resume details to load
+        wait_for(self.driver, 'resume_details')
+        self.record_page_weight('detail')
+        
+        # Extract contact information
+        contact_info = self._extract_contact_info()
+        
+        # Download resume
+        with self._stage('download') as span:
+            resume_path, resume_sha256 = self._download_resume(card['name'])
+            if resume_path is None:
+                span.fail()
+        
+        return {
+            'candidate_id': card['candidate_id'],
+            'name': card['name'],
+            'location': card['location'],
+            'email': contact_info.get('email'),
+            'phone': contact_info.get('phone'),
+            'emails': contact_info.get('emails'),
+            'phones': contact_info.get('phones'),
+            'profile_url': card['url'],
+            'resume_path': resume_path,
+            'resume_sha256': resume_sha256,
+            'timestamp': datetime.now().isoformat()
+        }
 
-    def _extract_contact_info(self) -> Dict[str, str]:
+    def _extract_contact_info(self) -> Dict:
         """Extract contact information from resume"""
-        contact_info = {'email': None, 'phone': None}
+        contact_info = {'email': None, 'phone': None, 'emails': [], 'phones': []}
         try:
-            resume_text = self.driver.find_element(By.CSS_SELECTOR, '.resume-details').text
-            
-            # Extract email using regex
-            email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-            email_match = re.search(email_pattern, resume_text)
-            if email_match:
-                contact_info['email'] = email_match.group(0)
-            
-            # Extract phone using regex
-            phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-            phone_match = re.search(phone_pattern, resume_text)
-            if phone_match:
-                contact_info['phone'] = phone_match.group(0)
+            resume_text = parse_resume_details(self.driver.page_source) or ''
+            
+            # All emails and E.164 phones, most likely first
+            contacts = extract_contacts(resume_text, self.default_country_code)
+            contact_info['emails'] = contacts['emails']
+            contact_info['phones'] = contacts['phones']
+            contact_info['email'] = next(iter(contacts['emails']), None)
+            contact_info['phone'] = next(iter(contacts['phones']), None)
                 
         except Exception as e:
             logger.warning(f"Failed to extract contact info: {str(e)}")
             
         return contact_info
 
-    def _download_resume(self, name: str) -> Optional[str]:
-        """Download resume and return the file path"""
+    def _download_resume(self, name: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Download resume and return its file path and sha256 (sha256 only when a store is set)"""
         try:
             # Click download button
-            download_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-tn-element="download-resume"]'))
-            )
+            download_button = wait_for(self.driver, 'download_button', CLICKABLE)
+            existing = list_downloads(self.download_dir)
             download_button.click()
             
-            # Wait for download to complete
-            time.sleep(2)  # Adjust based on download speed
+            # Wait for Chrome to finish writing the file instead of sleeping a fixed time
+            downloaded_file = wait_for_download(self.download_dir, existing, timeout=self.download_timeout)
+            DOWNLOAD_BYTES.observe(os.path.getsize(downloaded_file))
             
-            # Move file to appropriate location
-            downloads_dir = os.path.join(os.getcwd(), 'downloads')
-            os.makedirs(downloads_dir, exist_ok=True)
-            
-            # Find the downloaded file
-            downloaded_file = max(
-                [os.path.join(downloads_dir, f) for f in os.listdir(downloads_dir)],
-                key=os.path.getctime
-            )
+            # Keep one copy per distinct file, however often the candidate is scraped
+            if self.resume_store:
+                sha256, stored_path = self.resume_store.put_file(downloaded_file)
+                return stored_path, sha256
             
-            # Rename file
-            new_filename = f"{name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            new_filepath = os.path.join(downloads_dir, new_filename)
-            os.rename(downloaded_file, new_filepath)
+            # Move file to appropriate location
+            os.makedirs(self.downloads_dir, exist_ok=True)
+            extension = os.path.splitext(downloaded_file)[1] or '.pdf'
+            new_filename = f"{(name or 'resume').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+            new_filepath = os.path.join(self.downloads_dir, new_filename)
+            shutil.move(downloaded_file, new_filepath)
             
-            return new_filepath
+            return new_filepath, None
             
         except Exception as e:
             logger.error(f"Failed to download resume: {str(e)}")
-            return None
+            return None, None
 
-    def export_to_csv(self, results: List[Dict], output_path: str):
-        """Export results to CSV"""
+    def export_to_csv(self, results: Iterable[Dict], output_path: str):
+        """Export results to CSV, writing each row as it is read"""
         try:
-            df = pd.DataFrame(results)
-            df.to_csv(output_path, index=False)
+            with CsvResultWriter(output_path) as writer:
+                for record in results:
+                    writer.write(record)
             logger.info(f"Results exported to {output_path}")
         except Exception as e:
             logger.error(f"Failed to export to CSV: {str(e)}")
@@ -443,4 +768,7 @@ class IndeedResumeScraper:
     def cleanup(self):
         """Clean up resources"""
         if self.driver:
-            self.driver.quit() 
\ No newline at end of file
+            self.driver.quit()
+            self.driver = None
+            ACTIVE_DRIVERS.dec()
+        shutil.rmtree(self.download_dir, ignore_errors=True) 
\ No newline at end of file
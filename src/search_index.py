@@ -0,0 +1,112 @@
+import re
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from resume_store import candidate_key
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _match_terms(text: str) -> List[str]:
+    """Quote every word so user input can never be parsed as FTS5 query syntax"""
+    return [f'"{token}"' for token in TOKEN_RE.findall(text.lower())]
+
+
+class SearchIndex(SQLiteStore):
+    """SQLite FTS5 index over scraped candidates and their extracted resume text"""
+
+    def _create_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS indexed_candidates (
+                candidate_key TEXT PRIMARY KEY,
+                fts_rowid INTEGER NOT NULL,
+                resume_sha256 TEXT,
+                record TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS indexed_candidates_sha ON indexed_candidates (resume_sha256)'
+        )
+        # Porter stemming so "developers" matches a search for "developer"
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+                candidate_key UNINDEXED,
+                name,
+                location,
+                query,
+                text,
+                tokenize = 'porter unicode61'
+            )
+        ''')
+
+    def add_record(self, record: Dict, query: Optional[Dict] = None, text: Optional[str] = None):
+        """Index a scraped candidate, replacing any earlier entry for them"""
+        key = candidate_key(record)
+        if key is None:
+            return
+        query_text = ' '.join(str(query.get(field, '')) for field in ('keywords', 'location')) if query else ''
+        with self._connect() as conn:
+            existing = conn.execute(
+                'SELECT fts_rowid FROM indexed_candidates WHERE candidate_key = ?', (key,)
+            ).fetchone()
+            if existing:
+                if text is None:
+                    # Keep text indexed by an earlier run if this one has not extracted it yet
+                    text = conn.execute(
+                        'SELECT text FROM resume_fts WHERE rowid = ?', (existing['fts_rowid'],)
+                    ).fetchone()['text']
+                conn.execute('DELETE FROM resume_fts WHERE rowid = ?', (existing['fts_rowid'],))
+            fts_rowid = conn.execute(
+                'INSERT INTO resume_fts (candidate_key, name, location, query, text) VALUES (?, ?, ?, ?, ?)',
+                (key, record.get('name') or '', record.get('location') or '', query_text, text or '')
+            ).lastrowid
+            conn.execute(
+                'INSERT OR REPLACE INTO indexed_candidates '
+                '(candidate_key, fts_rowid, resume_sha256, record, indexed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, fts_rowid, record.get('resume_sha256'), json.dumps(record), datetime.now().isoformat())
+            )
+
+    def add_text(self, sha256: str, text: str):
+        """Attach extracted resume text to every candidate whose resume has this hash"""
+        with self._connect() as conn:
+            rowids = [row['fts_rowid'] for row in conn.execute(
+                'SELECT fts_rowid FROM indexed_candidates WHERE resume_sha256 = ?', (sha256,)
+            )]
+            for rowid in rowids:
+                conn.execute('UPDATE resume_fts SET text = ? WHERE rowid = ?', (text, rowid))
+
+    def contains(self, key: Optional[str]) -> bool:
+        """Whether a candidate is in the index"""
+        if key is None:
+            return False
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT 1 FROM indexed_candidates WHERE candidate_key = ?', (key,)
+            ).fetchone()
+        return row is not None
+
+    def search(self, keywords: str, location: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Candidates matching every keyword (in any field) and every location word, best first"""
+        terms = _match_terms(keywords)
+        if not terms:
+            return []
+        expression = ' '.join(terms)
+        location_terms = _match_terms(location or '')
+        if location_terms:
+            expression = f"({expression}) AND location : ({' '.join(location_terms)})"
+
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT c.record, bm25(resume_fts) AS score
+                FROM resume_fts
+                JOIN indexed_candidates c ON c.fts_rowid = resume_fts.rowid
+                WHERE resume_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            ''', (expression, limit)).fetchall()
+        return [json.loads(row['record']) for row in rows]
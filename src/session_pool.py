@@ -0,0 +1,159 @@
+import os
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from scraper import IndeedResumeScraper
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Pool of warm, logged-in scraper sessions that are leased out to jobs"""
+
+    def __init__(self, size: int = 2, max_pages: int = 200, max_memory_mb: Optional[float] = 1500,
+                 cookie_path: str = os.path.join('data', 'cookies.json'),
+                 scraper_factory: Callable[[], IndeedResumeScraper] = IndeedResumeScraper):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.cookie_path = cookie_path
+        self.scraper_factory = scraper_factory
+        self._idle: 'queue.Queue[IndeedResumeScraper]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._leased = 0
+
+    def start(self):
+        """Log in the configured number of sessions in the background"""
+        threading.Thread(target=self._warm_up, name='session-warmup', daemon=True).start()
+
+    def _warm_up(self):
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                logger.error(f"Failed to warm up browser session: {str(e)}")
+                return
+
+    def _create(self) -> IndeedResumeScraper:
+        """Start a driver and authenticate it, preferring saved cookies over a full login"""
+        scraper = self.scraper_factory()
+        try:
+            # Started on its own so driver_startup does not overlap the restore or login stage
+            scraper.ensure_driver()
+            if not scraper.restore_session(self.cookie_path):
+                if not scraper.login():
+                    raise RuntimeError('Failed to login to Indeed')
+            scraper.save_cookies(self.cookie_path)
+            logger.info("Browser session ready")
+            return scraper
+        except Exception:
+            scraper.cleanup()
+            raise
+
+    def _is_healthy(self, scraper: IndeedResumeScraper) -> bool:
+        """Check the driver is alive and still signed in"""
+        try:
+            if scraper.is_logged_in():
+                return True
+            scraper.navigate(scraper.base_url)
+            return scraper.wait_for_login_state()
+        except Exception as e:
+            logger.warning(f"Browser session health check failed: {str(e)}")
+            return False
+
+    def _needs_recycling(self, scraper: IndeedResumeScraper) -> bool:
+        if scraper.pages_loaded >= self.max_pages:
+            logger.info(f"Recycling browser session after {scraper.pages_loaded} pages")
+            return True
+        if self.max_memory_mb:
+            memory_mb = scraper.memory_usage_mb()
+            if memory_mb is not None and memory_mb >= self.max_memory_mb:
+                logger.info(f"Recycling browser session using {memory_mb:.0f} MB")
+                return True
+        return False
+
+    def _discard(self, scraper: IndeedResumeScraper):
+        try:
+            scraper.cleanup()
+        except Exception as e:
+            logger.warning(f"Failed to shut down browser session: {str(e)}")
+        with self._lock:
+            self._created -= 1
+
+    def _acquire(self, timeout: Optional[float]) -> IndeedResumeScraper:
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    scraper = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError('Timed out waiting for a browser session')
+
+            if self._is_healthy(scraper):
+                return scraper
+            logger.info("Discarding unhealthy browser session")
+            self._discard(scraper)
+
+    def _release(self, scraper: IndeedResumeScraper, healthy: bool):
+        if not healthy or self._needs_recycling(scraper):
+            self._discard(scraper)
+            return
+        scraper.save_cookies(self.cookie_path)
+        self._idle.put(scraper)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Borrow a logged-in scraper for the duration of a job"""
+        scraper = self._acquire(timeout)
+        with self._lock:
+            self._leased += 1
+        healthy = True
+        try:
+            yield scraper
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            with self._lock:
+                self._leased -= 1
+            self._release(scraper, healthy)
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool occupancy"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'active': self._created,
+                'leased': self._leased,
+                'idle': self._idle.qsize()
+            }
+
+    def shutdown(self):
+        """Quit every idle driver"""
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(scraper)
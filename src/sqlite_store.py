@@ -0,0 +1,33 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    """Base for classes that keep their state in a SQLite file
+
+    Every operation opens its own short-lived connection, because sqlite3 connections
+    cannot be shared across threads. Subclasses create their schema in _create_tables,
+    which runs once when the store is opened.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            # Readers do not block the writer, e.g. job polling while results are stored
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._create_tables(conn)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        raise NotImplementedError
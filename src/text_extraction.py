@@ -0,0 +1,151 @@
+import os
+import logging
+import threading
+import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from resume_store import hash_file
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# A PDF whose text layer has fewer characters than this is treated as a scan and OCR'd
+MIN_TEXT_LAYER_CHARS = 50
+
+OCR_DPI = 300
+
+
+def _pdf_text_layer(path: str) -> str:
+    """Text layer of a PDF via poppler's pdftotext, which pdf2image already depends on"""
+    result = subprocess.run(
+        ['pdftotext', '-layout', '-enc', 'UTF-8', path, '-'],
+        capture_output=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or 'pdftotext failed')
+    return result.stdout.decode('utf-8', 'replace')
+
+
+# OCR and DOCX libraries are imported where they are used: they only run in the extraction
+# worker processes, and pytesseract alone pulls in pandas when it is installed
+
+def _ocr_pdf(path: str) -> str:
+    import pytesseract
+    from pdf2image import convert_from_path
+    pages = convert_from_path(path, dpi=OCR_DPI)
+    return '\n'.join(pytesseract.image_to_string(page) for page in pages)
+
+
+def _docx_text(path: str) -> str:
+    import docx
+    document = docx.Document(path)
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append('\t'.join(cell.text for cell in row.cells))
+    return '\n'.join(lines)
+
+
+def extract_text(path: str) -> Tuple[str, str]:
+    """Extract plain text from a resume file, returning (text, method)
+
+    Runs in a worker process, so it must stay a module-level function.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        text = _pdf_text_layer(path)
+        if len(text.strip()) >= MIN_TEXT_LAYER_CHARS:
+            return text, 'pdf_text'
+        return _ocr_pdf(path), 'ocr'
+    if extension == '.docx':
+        return _docx_text(path), 'docx'
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read(), 'plain'
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring CPU affinity and a cgroup v2 quota (e.g. docker --cpus)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+class TextExtractionPipeline(SQLiteStore):
+    """Extract resume text on a process pool, caching results by file hash
+
+    Submitting a file returns immediately, so the browser loop never waits on PDF parsing
+    or OCR. Finished texts are written to a SQLite cache and handed to on_extracted.
+    """
+
+    def __init__(self, db_path: str, max_workers: Optional[int] = None,
+                 on_extracted: Optional[Callable[[str, str], None]] = None):
+        self.max_workers = max_workers or available_cpus()
+        self.on_extracted = on_extracted
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        SQLiteStore.__init__(self, db_path)
+
+    def _create_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS resume_text (
+                sha256 TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                text TEXT NOT NULL,
+                extracted_at TEXT NOT NULL
+            )
+        ''')
+
+    def get_text(self, sha256: str) -> Optional[str]:
+        """Cached text for a file hash, or None if it has not been extracted"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT text FROM resume_text WHERE sha256 = ?', (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def submit(self, path: str, sha256: Optional[str] = None) -> Optional[Future]:
+        """Queue a file for extraction unless its text is cached or already in progress"""
+        sha256 = sha256 or hash_file(path)
+        with self._lock:
+            if sha256 in self._pending:
+                return self._pending[sha256]
+            if self.get_text(sha256) is not None:
+                return None
+            future = self._executor.submit(extract_text, path)
+            self._pending[sha256] = future
+        future.add_done_callback(lambda done: self._store(sha256, path, done))
+        return future
+
+    def _store(self, sha256: str, path: str, future: Future):
+        try:
+            text, method = future.result()
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO resume_text (sha256, method, text, extracted_at) VALUES (?, ?, ?, ?)',
+                    (sha256, method, text, datetime.now().isoformat())
+                )
+            logger.info(f"Extracted {len(text)} characters from {os.path.basename(path)} ({method})")
+            if self.on_extracted:
+                self.on_extracted(sha256, text)
+        except Exception as e:
+            logger.error(f"Failed to extract text from {path}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.pop(sha256, None)
+
+    def pending(self) -> int:
+        """Number of files queued or being extracted"""
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,499 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import logging
+import mimetypes
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import requests
+from metrics import UPLOAD_FAILURES, UPLOAD_SECONDS
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+FILE = 'file'
+ROWS = 'rows'
+
+PENDING = 'pending'
+UPLOADING = 'uploading'
+DONE = 'done'
+FAILED = 'failed'
+
+SCOPES = ['https://www.googleapis.com/auth/drive.file', 'https://www.googleapis.com/auth/spreadsheets']
+DRIVE_UPLOAD_URL = 'https://www.googleapis.com/upload/drive/v3'
+SHEETS_API_URL = 'https://sheets.googleapis.com/v4'
+
+# Responses worth retrying; anything else in the 4xx range is a permanent failure
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Drive requires every chunk but the last to be a multiple of 256 KiB
+CHUNK_ALIGNMENT = 256 * 1024
+
+
+class UploadError(Exception):
+    """A failed upload request; maybe_applied means the server may have acted on it anyway"""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None,
+                 maybe_applied: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.maybe_applied = maybe_applied
+
+
+def google_session(service_account_file: str) -> requests.Session:
+    """requests session authorized for Drive and Sheets with a service account"""
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import AuthorizedSession
+    credentials = service_account.Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
+    return AuthorizedSession(credentials)
+
+
+def _cells(row: List) -> List[str]:
+    """A row as Sheets returns it: cells as strings, trailing empty cells dropped"""
+    cells = ['' if value is None else str(value) for value in row]
+    while cells and cells[-1] == '':
+        cells.pop()
+    return cells
+
+
+class GoogleUploader(SQLiteStore):
+    """Upload resumes to Google Drive and rows to Google Sheets from a local queue
+
+    Enqueueing is a single SQLite insert, so scraping never waits on the network. File
+    uploads run on max_workers threads as resumable Drive uploads; the upload session URL
+    is stored with the entry, so an interrupted upload continues from the last byte Drive
+    acknowledged. Rows are appended by one thread in batches of up to batch_rows per
+    values.append call. Failed requests are retried with exponential backoff and jitter.
+    values.append is not idempotent, so a batch whose request may have been applied (a lost
+    response or a 5xx) is kept together under a batch_id and, before it is sent again, the
+    sheet is read back to check whether the rows are already there. A batch rejected with a
+    permanent error is split in halves until the offending row is isolated.
+
+    session_factory returns the requests.Session-like transport used for every call; with
+    drive_upload_url and sheets_url it can point the uploader at a fake API server.
+    """
+
+    def __init__(self, db_path: str, session_factory: Callable[[], requests.Session],
+                 spreadsheet_id: Optional[str] = None, sheet_range: str = 'Sheet1!A1',
+                 folder_id: Optional[str] = None, max_workers: int = 2, batch_rows: int = 500,
+                 flush_interval: float = 5.0, chunk_size: int = 8 * 1024 * 1024, max_attempts: int = 8,
+                 backoff_base: float = 1.0, backoff_max: float = 300.0, timeout: float = 60.0,
+                 drive_upload_url: str = DRIVE_UPLOAD_URL, sheets_url: str = SHEETS_API_URL):
+        self.session_factory = session_factory
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_range = sheet_range
+        self.folder_id = folder_id
+        self.max_workers = max_workers
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.chunk_size = max(CHUNK_ALIGNMENT, chunk_size - chunk_size % CHUNK_ALIGNMENT)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.drive_upload_url = drive_upload_url.rstrip('/')
+        self.sheets_url = sheets_url.rstrip('/')
+        self._local = threading.local()
+        self._files_ready = threading.Condition()
+        self._rows_ready = threading.Condition()
+        self._rows_waiting = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+        SQLiteStore.__init__(self, db_path)
+        self._requeue_interrupted()
+
+    def _create_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS uploads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                target TEXT NOT NULL,
+                source TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                session_url TEXT,
+                batch_id TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                finished_at TEXT
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS uploads_pending ON uploads (kind, status, next_attempt_at)')
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(uploads)')}
+        if 'batch_id' not in columns:
+            conn.execute('ALTER TABLE uploads ADD COLUMN batch_id TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS uploads_source ON uploads (source, target)')
+        conn.execute('CREATE INDEX IF NOT EXISTS uploads_batch ON uploads (batch_id)')
+
+    def _requeue_interrupted(self):
+        """Entries being uploaded when the process died go back to pending, keeping their session URL"""
+        with self._connect() as conn:
+            conn.execute('UPDATE uploads SET status = ? WHERE status = ?', (PENDING, UPLOADING))
+
+    def start(self):
+        """Start the file upload workers and the Sheets flusher"""
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._file_loop, name=f'drive-upload-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._rows_loop, name='sheets-append', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        logger.info(f"Uploader started with {self.max_workers} Drive worker(s)")
+
+    def stop(self):
+        """Ask the threads to exit after their current request"""
+        self._stopping = True
+        for condition in (self._files_ready, self._rows_ready):
+            with condition:
+                condition.notify_all()
+
+    def enqueue_file(self, path: str, name: Optional[str] = None, folder_id: Optional[str] = None,
+                     mime_type: Optional[str] = None) -> int:
+        """Queue a file for Drive; a file already queued or uploaded to the same folder is not queued twice"""
+        target = folder_id or self.folder_id or ''
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id FROM uploads WHERE source = ? AND target = ? AND kind = ? AND status != ?',
+                (path, target, FILE, FAILED)
+            ).fetchone()
+            if row:
+                return row['id']
+            payload = {
+                'path': path,
+                'name': name or os.path.basename(path),
+                'mime_type': mime_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            }
+            upload_id = conn.execute(
+                'INSERT INTO uploads (kind, target, source, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (FILE, target, path, json.dumps(payload), PENDING, datetime.now().isoformat())
+            ).lastrowid
+        with self._files_ready:
+            self._files_ready.notify()
+        return upload_id
+
+    def enqueue_rows(self, rows: List[List], spreadsheet_id: Optional[str] = None):
+        """Queue rows to be appended to a spreadsheet"""
+        spreadsheet_id = spreadsheet_id or self.spreadsheet_id
+        if not spreadsheet_id:
+            raise ValueError('No spreadsheet configured')
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO uploads (kind, target, payload, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                [(ROWS, spreadsheet_id, json.dumps(row), PENDING, now) for row in rows]
+            )
+        with self._rows_ready:
+            self._rows_waiting += len(rows)
+            if self._rows_waiting >= self.batch_rows:
+                self._rows_ready.notify()
+
+    def pending(self) -> int:
+        """Entries not yet uploaded or given up on"""
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT COUNT(*) FROM uploads WHERE status IN (?, ?)', (PENDING, UPLOADING)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Entry counts by kind and status"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT kind, status, COUNT(*) AS n FROM uploads GROUP BY kind, status').fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row['kind'], {})[row['status']] = row['n']
+        return counts
+
+    def _session(self) -> requests.Session:
+        # Sessions are not thread-safe, so each upload thread gets its own
+        if not hasattr(self._local, 'session'):
+            self._local.session = self.session_factory()
+        return self._local.session
+
+    def _request(self, method: str, url: str, ok: Tuple[int, ...] = (200,), **kwargs) -> requests.Response:
+        try:
+            response = self._session().request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            # Only a connect timeout guarantees the request never reached the server
+            raise UploadError(
+                f"{method} {url} failed: {str(e)}", maybe_applied=not isinstance(e, requests.ConnectTimeout)
+            )
+        if response.status_code in ok:
+            return response
+        retry_after = response.headers.get('Retry-After')
+        raise UploadError(
+            f"{method} {url} returned {response.status_code}: {response.text[:200]}",
+            retryable=response.status_code in RETRY_STATUSES,
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            maybe_applied=response.status_code >= 500
+        )
+
+    def _backoff(self, attempts: int, error: UploadError) -> float:
+        if error.retry_after is not None:
+            return error.retry_after
+        return min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+    def _claim(self, conn, ids: List[int]) -> List[int]:
+        claimed = []
+        for upload_id in ids:
+            if conn.execute(
+                'UPDATE uploads SET status = ? WHERE id = ? AND status = ?', (UPLOADING, upload_id, PENDING)
+            ).rowcount:
+                claimed.append(upload_id)
+        conn.commit()
+        return claimed
+
+    def _finish(self, ids: List[int], result: Dict):
+        with self._connect() as conn:
+            conn.executemany(
+                'UPDATE uploads SET status = ?, result = ?, error = NULL, finished_at = ? WHERE id = ?',
+                [(DONE, json.dumps(result), datetime.now().isoformat(), upload_id) for upload_id in ids]
+            )
+
+    def _fail(self, kind: str, ids: List[int], error: UploadError):
+        """Schedule a retry, or give up once an entry is out of attempts or the error is permanent"""
+        UPLOAD_FAILURES.labels(kind).inc()
+        with self._connect() as conn:
+            if kind == ROWS and error.retryable and error.maybe_applied:
+                # Exactly the rows of this request are retried together, checked against the sheet
+                # before they are sent again. A fresh ID even if they had one: after a split, the
+                # rows of an earlier batch_id are no longer sent, or appended, as one block.
+                batch_id = uuid.uuid4().hex
+                conn.executemany(
+                    'UPDATE uploads SET batch_id = ? WHERE id = ?',
+                    [(batch_id, upload_id) for upload_id in ids]
+                )
+            for upload_id in ids:
+                attempts = conn.execute('SELECT attempts FROM uploads WHERE id = ?', (upload_id,)).fetchone()[0] + 1
+                if error.retryable and attempts < self.max_attempts:
+                    delay = self._backoff(attempts, error)
+                    conn.execute(
+                        'UPDATE uploads SET status = ?, attempts = ?, next_attempt_at = ?, error = ? WHERE id = ?',
+                        (PENDING, attempts, time.time() + delay, str(error), upload_id)
+                    )
+                else:
+                    conn.execute(
+                        'UPDATE uploads SET status = ?, attempts = ?, error = ?, finished_at = ? WHERE id = ?',
+                        (FAILED, attempts, str(error), datetime.now().isoformat(), upload_id)
+                    )
+        if error.retryable:
+            logger.warning(f"{kind} upload of {len(ids)} entr{'y' if len(ids) == 1 else 'ies'} failed, will retry: {str(error)}")
+        else:
+            logger.error(f"{kind} upload of {len(ids)} entr{'y' if len(ids) == 1 else 'ies'} failed: {str(error)}")
+
+    # Drive
+
+    def _claim_file(self) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    'SELECT * FROM uploads WHERE kind = ? AND status = ? AND next_attempt_at <= ? ORDER BY id LIMIT 1',
+                    (FILE, PENDING, time.time())
+                ).fetchone()
+                if row is None:
+                    return None
+                if self._claim(conn, [row['id']]):
+                    return row
+
+    def _file_loop(self):
+        while not self._stopping:
+            try:
+                entry = self._claim_file()
+            except Exception as e:
+                logger.error(f"Failed to claim upload: {str(e)}")
+                entry = None
+            if entry is None:
+                with self._files_ready:
+                    self._files_ready.wait(self.flush_interval)
+                continue
+
+            start = time.perf_counter()
+            try:
+                file_id = self._upload_file(entry)
+                self._finish([entry['id']], {'file_id': file_id})
+                UPLOAD_SECONDS.labels(FILE).observe(time.perf_counter() - start)
+            except UploadError as e:
+                self._fail(FILE, [entry['id']], e)
+            except Exception as e:
+                self._fail(FILE, [entry['id']], UploadError(str(e), retryable=False))
+
+    def _upload_file(self, entry: sqlite3.Row) -> str:
+        """Upload a file in chunks over a resumable session and return its Drive file ID"""
+        payload = json.loads(entry['payload'])
+        total = os.path.getsize(payload['path'])
+
+        session_url = entry['session_url']
+        offset = None
+        if session_url:
+            offset, file_id = self._resume_offset(session_url, total)
+            if file_id:
+                return file_id
+        if offset is None:
+            session_url = self._start_session(entry, payload, total)
+            offset = 0
+
+        with open(payload['path'], 'rb') as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                content_range = f'bytes {offset}-{offset + len(chunk) - 1}/{total}' if chunk else f'bytes */{total}'
+                response = self._request(
+                    'PUT', session_url, ok=(200, 201, 308, 404, 410), data=chunk,
+                    headers={'Content-Range': content_range}
+                )
+                if response.status_code in (200, 201):
+                    return response.json()['id']
+                if response.status_code in (404, 410):
+                    # The upload session expired; the retry starts a new one
+                    with self._connect() as conn:
+                        conn.execute('UPDATE uploads SET session_url = NULL WHERE id = ?', (entry['id'],))
+                    raise UploadError(f"Upload session for {payload['name']} expired")
+                offset = self._acknowledged(response)
+
+    def _start_session(self, entry: sqlite3.Row, payload: Dict, total: int) -> str:
+        metadata = {'name': payload['name']}
+        if entry['target']:
+            metadata['parents'] = [entry['target']]
+        response = self._request(
+            'POST', f'{self.drive_upload_url}/files?uploadType=resumable&supportsAllDrives=true',
+            json=metadata,
+            headers={'X-Upload-Content-Type': payload['mime_type'], 'X-Upload-Content-Length': str(total)}
+        )
+        session_url = response.headers['Location']
+        with self._connect() as conn:
+            conn.execute('UPDATE uploads SET session_url = ? WHERE id = ?', (session_url, entry['id']))
+        return session_url
+
+    def _resume_offset(self, session_url: str, total: int) -> Tuple[Optional[int], Optional[str]]:
+        """Ask Drive how much of an interrupted upload it has: (next offset, file ID if already complete)
+
+        An expired session gives (None, None) and the upload starts over.
+        """
+        response = self._request(
+            'PUT', session_url, ok=(200, 201, 308, 404, 410), headers={'Content-Range': f'bytes */{total}'}
+        )
+        if response.status_code in (200, 201):
+            return total, response.json()['id']
+        if response.status_code in (404, 410):
+            return None, None
+        return self._acknowledged(response), None
+
+    @staticmethod
+    def _acknowledged(response: requests.Response) -> int:
+        """Next offset from a 308 response's Range header ('bytes=0-N'); no header means nothing was stored"""
+        received = response.headers.get('Range')
+        return int(received.rsplit('-', 1)[1]) + 1 if received else 0
+
+    # Sheets
+
+    def _claim_rows(self) -> Tuple[Optional[str], List[int], List[List], bool]:
+        """Claim the next batch of rows bound for one spreadsheet: (spreadsheet, ids, values, verify)
+
+        Rows of a batch that may already have been applied are claimed together, first, and
+        come back with verify set; otherwise up to batch_rows new rows, oldest first.
+        """
+        with self._connect() as conn:
+            now = time.time()
+            first = conn.execute(
+                'SELECT target, batch_id FROM uploads WHERE kind = ? AND status = ? AND next_attempt_at <= ? '
+                'ORDER BY batch_id IS NULL, id LIMIT 1',
+                (ROWS, PENDING, now)
+            ).fetchone()
+            if first is None:
+                return None, [], [], False
+            if first['batch_id']:
+                rows = conn.execute(
+                    'SELECT id, payload FROM uploads WHERE kind = ? AND status = ? AND batch_id = ? ORDER BY id',
+                    (ROWS, PENDING, first['batch_id'])
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT id, payload FROM uploads WHERE kind = ? AND status = ? AND target = ? '
+                    'AND batch_id IS NULL AND next_attempt_at <= ? ORDER BY id LIMIT ?',
+                    (ROWS, PENDING, first['target'], now, self.batch_rows)
+                ).fetchall()
+            claimed = set(self._claim(conn, [row['id'] for row in rows]))
+        rows = [row for row in rows if row['id'] in claimed]
+        values = [json.loads(row['payload']) for row in rows]
+        return first['target'], [row['id'] for row in rows], values, bool(first['batch_id'])
+
+    def _rows_loop(self):
+        while not self._stopping:
+            with self._rows_ready:
+                # Let rows accumulate into a full batch, or flush whatever is there every flush_interval
+                if self._rows_waiting < self.batch_rows:
+                    self._rows_ready.wait(self.flush_interval)
+                self._rows_waiting = 0
+            while not self._stopping:
+                try:
+                    spreadsheet_id, ids, values, verify = self._claim_rows()
+                except Exception as e:
+                    logger.error(f"Failed to claim rows: {str(e)}")
+                    break
+                if not ids:
+                    break
+                if verify:
+                    try:
+                        if self._rows_present(spreadsheet_id, values):
+                            logger.info(f"{len(ids)} rows were already appended to spreadsheet {spreadsheet_id}")
+                            self._finish(ids, {'updated_range': None, 'already_present': True})
+                            continue
+                    except UploadError as e:
+                        self._fail(ROWS, ids, e)
+                        continue
+                    except Exception as e:
+                        self._fail(ROWS, ids, UploadError(str(e), retryable=False))
+                        continue
+                self._send_rows(spreadsheet_id, ids, values)
+
+    def _send_rows(self, spreadsheet_id: str, ids: List[int], values: List[List]):
+        """Append a batch; on a permanent error, halve it until the rejected rows are isolated"""
+        start = time.perf_counter()
+        try:
+            result = self._append_rows(spreadsheet_id, values)
+            self._finish(ids, result)
+            UPLOAD_SECONDS.labels(ROWS).observe(time.perf_counter() - start)
+            logger.info(f"Appended {len(ids)} rows to spreadsheet {spreadsheet_id}")
+        except UploadError as e:
+            if not e.retryable and len(ids) > 1:
+                middle = len(ids) // 2
+                logger.warning(f"Spreadsheet rejected {len(ids)} rows, retrying in halves: {str(e)}")
+                self._send_rows(spreadsheet_id, ids[:middle], values[:middle])
+                self._send_rows(spreadsheet_id, ids[middle:], values[middle:])
+            else:
+                self._fail(ROWS, ids, e)
+        except Exception as e:
+            self._fail(ROWS, ids, UploadError(str(e), retryable=False))
+
+    def _rows_present(self, spreadsheet_id: str, values: List[List]) -> bool:
+        """Whether the sheet already holds these rows consecutively, i.e. an earlier append went through"""
+        sheet = self.sheet_range.split('!')[0]
+        response = self._request(
+            'GET', f'{self.sheets_url}/spreadsheets/{spreadsheet_id}/values/{quote(sheet)}',
+            params={'valueRenderOption': 'UNFORMATTED_VALUE'}
+        )
+        existing = [_cells(row) for row in response.json().get('values', [])]
+        wanted = [_cells(row) for row in values]
+        # Most likely near the end, since batches are appended in order
+        for offset in range(len(existing) - len(wanted), -1, -1):
+            if existing[offset] == wanted[0] and existing[offset:offset + len(wanted)] == wanted:
+                return True
+        return False
+
+    def _append_rows(self, spreadsheet_id: str, values: List[List]) -> Dict:
+        response = self._request(
+            'POST', f'{self.sheets_url}/spreadsheets/{spreadsheet_id}/values/{quote(self.sheet_range)}:append',
+            params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+            json={'values': values}
+        )
+        return {'updated_range': response.json().get('updates', {}).get('updatedRange')}
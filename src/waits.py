@@ -0,0 +1,125 @@
+import os
+import time
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+from extraction import SELECTORS
+from metrics import WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PRESENT = 'present'
+CLICKABLE = 'clickable'
+
+# Seconds to wait for each element before giving up. The driver's implicit wait is 0,
+# so a lookup that is allowed to fail costs its own timeout here and nothing elsewhere.
+WAIT_TIMEOUTS: Dict[str, float] = {
+    'sign_in_button': 5,
+    'email_input': 10,
+    'password_input': 10,
+    'submit_button': 10,
+    'login_result': 20,
+    'login_state': 5,
+    'verification_result': 5,
+    'search_input': 10,
+    'location_input': 3,
+    'search_button': 5,
+    'experience_filter': 2,
+    'education_filter': 2,
+    'filter_option': 2,
+    'resume_card': 10,
+    'resume_details': 10,
+    'download_button': 5
+}
+DEFAULT_TIMEOUT = 10
+
+# Multiplies every timeout, for slow networks or machines
+TIMEOUT_SCALE = float(os.getenv('WAIT_TIMEOUT_SCALE', 1))
+
+POLL_FREQUENCY = 0.1
+
+# Locator strategies as WebDriver names them; selenium itself is imported only once a wait
+# runs, since importing any part of selenium.webdriver loads every browser's driver
+CSS_SELECTOR = 'css selector'
+XPATH = 'xpath'
+
+Locator = Tuple[str, str]
+
+
+def timeout_for(name: str) -> float:
+    return WAIT_TIMEOUTS.get(name, DEFAULT_TIMEOUT) * TIMEOUT_SCALE
+
+
+def locator_for(name: str) -> Locator:
+    return CSS_SELECTOR, SELECTORS[name]
+
+
+def _record(name: str, outcome: str, start: float):
+    elapsed = time.perf_counter() - start
+    WAIT_SECONDS.labels(name, outcome).observe(elapsed)
+    logger.debug(f"wait={name} outcome={outcome} seconds={elapsed:.3f}")
+
+
+def wait_for(driver, name: str, condition: str = PRESENT, timeout: Optional[float] = None,
+             locator: Optional[Locator] = None):
+    """Wait for the element registered as name in SELECTORS (or at locator) and return it
+
+    Raises TimeoutException when it does not appear within the tuned timeout.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    locator = locator or locator_for(name)
+    if condition == CLICKABLE:
+        expected = EC.element_to_be_clickable(locator)
+    else:
+        expected = EC.presence_of_element_located(locator)
+    start = time.perf_counter()
+    try:
+        element = WebDriverWait(driver, timeout if timeout is not None else timeout_for(name),
+                                poll_frequency=POLL_FREQUENCY).until(expected)
+    except TimeoutException:
+        _record(name, 'timeout', start)
+        raise
+    _record(name, 'ok', start)
+    return element
+
+
+def find_optional(driver, name: str, condition: str = PRESENT, timeout: Optional[float] = None,
+                  locator: Optional[Locator] = None):
+    """Like wait_for, but return None instead of raising when the element never shows up"""
+    from selenium.common.exceptions import TimeoutException
+    try:
+        return wait_for(driver, name, condition, timeout, locator)
+    except TimeoutException:
+        return None
+
+
+def wait_any(driver, names: Iterable[str], label: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Race several SELECTORS entries, e.g. a success and an error element
+
+    Returns the name of the first one present, or None on timeout.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+    names = list(names)
+
+    def first_present(d):
+        for name in names:
+            if d.find_elements(*locator_for(name)):
+                return name
+        return False
+
+    start = time.perf_counter()
+    try:
+        matched = WebDriverWait(driver, timeout if timeout is not None else timeout_for(label),
+                                poll_frequency=POLL_FREQUENCY).until(first_present)
+    except TimeoutException:
+        _record(label, 'timeout', start)
+        return None
+    _record(label, matched, start)
+    return matched
+
+
+def is_present(driver, name: str) -> bool:
+    """Check for an element right now, without waiting"""
+    return len(driver.find_elements(*locator_for(name))) > 0
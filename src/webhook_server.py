@@ -1,11 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import time
 import os
 import json
 from datetime import datetime
-from scraper import IndeedResumeScraper
+from session_pool import SessionPool
+from scraper import IndeedResumeScraper, SessionLostError
+from checkpoint import CheckpointJournal
+from resume_store import ResumeStore, candidate_key
+from search_index import SearchIndex
+from result_cache import NUMERIC_FIELDS, ResultCache
+from metrics import CARDS_PER_SECOND, QUEUE_DEPTH, UPLOAD_QUEUE_DEPTH, JobTimer, timed_stage
+from text_extraction import TextExtractionPipeline
+from job_queue import JobQueue, COMPLETED, FAILED
+from export import CSV_FIELDS, CsvResultWriter, record_values, to_csv_chunk, to_ndjson_chunk
 import logging
 from dotenv import load_dotenv
 import traceback
+from contextlib import ExitStack
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 # Configure logging with more detail
 logging.basicConfig(
@@ -19,6 +31,349 @@ load_dotenv()
 
 app = Flask(__name__)
 
+# Upper bound on records per job when the request does not set max_results
+DEFAULT_MAX_RESULTS = int(os.getenv('DEFAULT_MAX_RESULTS', 100))
+
+# How often a streaming response checks its job for new records
+STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', 1))
+
+SOURCES = ('live', 'local', 'hybrid')
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Each job journals its progress here so it can resume after a crash or a lost session
+CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', os.path.join(os.getcwd(), 'data', 'checkpoints'))
+
+# Attempts per job; each retry resumes from the checkpoint on a fresh browser session
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# Log the browser sessions in at startup instead of on the first job
+SESSION_WARMUP = os.getenv('SESSION_WARMUP', '').lower() in ('1', 'true', 'yes')
+
+# Most filter sets accepted by one /scrape/batch request
+MAX_BATCH_QUERIES = int(os.getenv('MAX_BATCH_QUERIES', 50))
+
+# The combined CSV of a batch says which query each candidate was found by
+BATCH_CSV_FIELDS = CSV_FIELDS + ['query_index']
+
+# Kind given to jobs enqueued by /scrape/batch, whose filters hold the list of queries
+BATCH_JOB = 'batch'
+
+def invalid_filter(query):
+    """Return an error message if a numeric filter is not a non-negative number, else None"""
+    for field, kind in NUMERIC_FIELDS.items():
+        value = query.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            if kind(value) >= 0:
+                continue
+        except (TypeError, ValueError):
+            pass
+        return f'Invalid {field}: {value!r}'
+    return None
+
+def run_scrape_job(job, jobs):
+    """Run one queued scrape job on a worker thread, resuming from its checkpoint if it has one
+
+    A batch job (kind BATCH_JOB, enqueued by /scrape/batch) runs every query in turn on the
+    same browser session and skips candidates an earlier query already returned.
+    """
+    job_id = job['id']
+    filters = job['filters']
+    batch = job['kind'] == BATCH_JOB
+    queries = filters['queries'] if batch else [filters]
+
+    if batch:
+        checkpoints = [
+            CheckpointJournal(os.path.join(CHECKPOINT_DIR, f'{job_id}-{index}.jsonl'))
+            for index in range(len(queries))
+        ]
+    else:
+        checkpoints = [CheckpointJournal(os.path.join(CHECKPOINT_DIR, f'{job_id}.jsonl'))]
+
+    csv_path = checkpoints[0].load().csv_path
+    if csv_path:
+        logger.info(f"[{job_id}] Resuming from checkpoint")
+    else:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_dir = os.path.join(os.getcwd(), 'output')
+        os.makedirs(output_dir, exist_ok=True)
+        prefix = 'batch' if batch else 'results'
+        csv_path = os.path.join(output_dir, f'{prefix}_{timestamp}_{job_id[:8]}.csv')
+        for query, checkpoint in zip(queries, checkpoints):
+            checkpoint.record_query(query, csv_path)
+
+    timer = JobTimer(job_id)
+    stats = {
+        'skipped': 0,
+        'search_seconds': 0.0,
+        'duplicates': [0] * len(queries)
+    }
+    # The job ends here, completed or failed, so nothing will resume from its journals;
+    # only a crash of the whole process leaves them for the requeued job
+    try:
+        for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+            try:
+                result_count = run_scrape_attempt(job_id, queries, checkpoints, jobs, csv_path, timer, stats, batch)
+                break
+            except SessionLostError as e:
+                if attempt == JOB_MAX_ATTEMPTS:
+                    raise
+                logger.warning(
+                    f"[{job_id}] {str(e)}; resuming from checkpoint on a fresh session "
+                    f"(attempt {attempt + 1}/{JOB_MAX_ATTEMPTS})"
+                )
+
+        per_query = [
+            {
+                'query_index': index,
+                'keywords': query.get('keywords'),
+                'location': query.get('location'),
+                'result_count': len(checkpoint.load().processed),
+                'duplicate_count': stats['duplicates'][index]
+            }
+            for index, (query, checkpoint) in enumerate(zip(queries, checkpoints))
+        ]
+    finally:
+        for checkpoint in checkpoints:
+            checkpoint.remove()
+
+    search_seconds = stats['search_seconds']
+    if result_count and search_seconds:
+        CARDS_PER_SECOND.observe(result_count / search_seconds)
+
+    logger.info(f"[{job_id}] Results exported to {csv_path}")
+    output = {
+        'message': f'Found {result_count} results',
+        'result_count': result_count,
+        'new_count': result_count,
+        'skipped_count': stats['skipped'],
+        'csv_path': csv_path,
+        'cards_per_second': round(result_count / search_seconds, 3) if search_seconds else None,
+        'timings': timer.summary()
+    }
+    if batch:
+        output['queries'] = per_query
+    return output
+
+
+def run_scrape_attempt(job_id, queries, checkpoints, jobs, csv_path, timer, stats, batch):
+    """Scrape on one leased session from the job's checkpoints and return the job's total records
+
+    A SessionLostError leaves the lease marked unhealthy, so the session is discarded and the
+    next attempt gets a different driver.
+    """
+    states = [checkpoint.load() for checkpoint in checkpoints]
+    # Queries run in order, so only the one in progress can have records stored past its
+    # journal; they belong to a card that will be scraped again
+    jobs.truncate_results(job_id, sum(len(state.processed) for state in states))
+    kept = jobs.get_results(job_id)
+
+    # Candidates already returned by this job, to keep a batch free of duplicates
+    returned = set()
+    for state in states:
+        returned |= state.processed
+    total = sum(int(query.get('max_results') or DEFAULT_MAX_RESULTS) for query in queries)
+
+    with ExitStack() as stack:
+        logger.debug(f"[{job_id}] Waiting for a browser session...")
+        with timed_stage('session_wait', timer):
+            scraper = stack.enter_context(session_pool.lease())
+        scraper.timer = timer
+        stack.callback(setattr, scraper, 'timer', None)
+        csv_writer = stack.enter_context(CsvResultWriter(csv_path, BATCH_CSV_FIELDS if batch else None))
+        for record in kept:
+            csv_writer.write(record)
+        result_count = len(kept)
+        jobs.update_progress(job_id, result_count, total)
+
+        for index, (query, checkpoint, state) in enumerate(zip(queries, checkpoints, states)):
+            if state.done:
+                continue
+            max_results = int(query.get('max_results') or DEFAULT_MAX_RESULTS)
+            freshness_hours = float(query['freshness_hours']) if 'freshness_hours' in query else None
+            # Hybrid requests already got the local results; only fetch candidates the index lacks
+            hybrid = query.get('source') == 'hybrid'
+
+            def skip_candidate(card, index=index, hybrid=hybrid):
+                key = candidate_key(card)
+                if key in returned:
+                    stats['duplicates'][index] += 1
+                    return True
+                return hybrid and search_index.contains(key)
+
+            logger.debug(f"[{job_id}] Starting resume search {index + 1}/{len(queries)}...")
+            search_started = time.perf_counter()
+            try:
+                records = scraper.iter_resumes(
+                    query, max_results=max_results, freshness_hours=freshness_hours,
+                    skip_candidate=skip_candidate, checkpoint=checkpoint
+                )
+                for record in records:
+                    result_count += 1
+                    returned.add(candidate_key(record))
+                    # query_index only means something in this batch's output, so the candidate
+                    # is indexed without it
+                    result = {**record, 'query_index': index} if batch else record
+                    with timed_stage('export', timer):
+                        csv_writer.write(result)
+                        jobs.append_result(job_id, result)
+                        search_index.add_record(
+                            record, query=query,
+                            text=text_pipeline.get_text(record['resume_sha256']) if record.get('resume_sha256') else None
+                        )
+                    if record.get('resume_path'):
+                        # Text extraction runs on a process pool while the browser moves on
+                        text_pipeline.submit(record['resume_path'], record.get('resume_sha256'))
+                    queue_uploads(result, query, batch)
+                    jobs.update_progress(job_id, result_count, total)
+            finally:
+                stats['search_seconds'] += time.perf_counter() - search_started
+                stats['skipped'] += scraper.last_run_stats['skipped']
+            checkpoint.record_done()
+            if batch:
+                logger.info(f"[{job_id}] Query {index + 1}/{len(queries)} finished")
+
+    return result_count
+
+
+def queue_uploads(record, query, batch):
+    """Hand a record to the background uploader; only a local SQLite insert happens here"""
+    if uploader is None:
+        return
+    if query.get('storage') == 'google_drive' and record.get('resume_path'):
+        extension = os.path.splitext(record['resume_path'])[1]
+        uploader.enqueue_file(
+            record['resume_path'],
+            name=f"{(record.get('name') or 'resume').replace(' ', '_')}_{record.get('candidate_id') or ''}{extension}",
+            folder_id=query.get('drive_folder_id')
+        )
+    if query.get('output_format') == 'google_sheets' and (query.get('spreadsheet_id') or uploader.spreadsheet_id):
+        uploader.enqueue_rows(
+            [record_values(record, BATCH_CSV_FIELDS if batch else None)],
+            spreadsheet_id=query.get('spreadsheet_id')
+        )
+
+
+max_workers = int(os.getenv('MAX_WORKERS', 2))
+
+resume_store = ResumeStore(
+    root=os.getenv('RESUME_STORE_DIR', os.path.join(os.getcwd(), 'downloads', 'store')),
+    db_path=os.getenv('RESUME_DB_PATH', os.path.join(os.getcwd(), 'data', 'resumes.db'))
+)
+
+search_index = SearchIndex(
+    db_path=os.getenv('SEARCH_DB_PATH', os.path.join(os.getcwd(), 'data', 'search.db'))
+)
+
+text_pipeline = TextExtractionPipeline(
+    db_path=os.getenv('RESUME_DB_PATH', os.path.join(os.getcwd(), 'data', 'resumes.db')),
+    max_workers=int(os.getenv('TEXT_WORKERS', 0)) or None,
+    on_extracted=search_index.add_text
+)
+
+session_pool = SessionPool(
+    size=int(os.getenv('SESSION_POOL_SIZE', max_workers)),
+    max_pages=int(os.getenv('SESSION_MAX_PAGES', 200)),
+    max_memory_mb=float(os.getenv('SESSION_MAX_MEMORY_MB', 1500)),
+    cookie_path=os.getenv('COOKIE_PATH', os.path.join(os.getcwd(), 'data', 'cookies.json')),
+    scraper_factory=lambda: IndeedResumeScraper(resume_store=resume_store)
+)
+
+job_queue = JobQueue(
+    db_path=os.getenv('JOB_DB_PATH', os.path.join(os.getcwd(), 'data', 'jobs.db')),
+    handler=run_scrape_job,
+    max_workers=max_workers
+)
+
+QUEUE_DEPTH.set_function(job_queue.depth)
+
+# Drive and Sheets uploads are enabled by configuring a service account
+google_credentials = os.getenv('GOOGLE_SERVICE_ACCOUNT_FILE')
+uploader = None
+if google_credentials:
+    from uploader import DRIVE_UPLOAD_URL, SHEETS_API_URL, GoogleUploader, google_session
+    uploader = GoogleUploader(
+        db_path=os.getenv('UPLOAD_DB_PATH', os.path.join(os.getcwd(), 'data', 'uploads.db')),
+        session_factory=lambda: google_session(google_credentials),
+        spreadsheet_id=os.getenv('GOOGLE_SHEETS_SPREADSHEET_ID'),
+        sheet_range=os.getenv('GOOGLE_SHEETS_RANGE', 'Sheet1!A1'),
+        folder_id=os.getenv('GOOGLE_DRIVE_FOLDER_ID'),
+        max_workers=int(os.getenv('UPLOAD_WORKERS', 2)),
+        batch_rows=int(os.getenv('SHEETS_BATCH_ROWS', 500)),
+        flush_interval=float(os.getenv('SHEETS_FLUSH_SECONDS', 5)),
+        drive_upload_url=os.getenv('GOOGLE_DRIVE_UPLOAD_URL', DRIVE_UPLOAD_URL),
+        sheets_url=os.getenv('GOOGLE_SHEETS_API_URL', SHEETS_API_URL)
+    )
+    UPLOAD_QUEUE_DEPTH.set_function(uploader.pending)
+
+result_cache = ResultCache(
+    job_queue,
+    ttl_seconds=float(os.getenv('RESULT_CACHE_TTL', 3600)),
+    max_entries=int(os.getenv('RESULT_CACHE_SIZE', 256))
+)
+
+
+def stream_job_results(job_id, stream_format):
+    """Stream a job's records as they are produced, until the job finishes"""
+    def generate():
+        offset = 0
+        batch = job_queue.get(job_id)['kind'] == BATCH_JOB
+        fields = BATCH_CSV_FIELDS if batch else CSV_FIELDS
+        if stream_format == 'csv':
+            yield to_csv_chunk([], include_header=True, fields=fields)
+        while True:
+            # Read the status before the records so nothing written in between is missed
+            job = job_queue.get(job_id)
+            records = job_queue.get_results(job_id, offset=offset)
+            if records:
+                offset += len(records)
+                if stream_format == 'csv':
+                    yield to_csv_chunk(records, fields=fields)
+                else:
+                    yield to_ndjson_chunk(records)
+            if job['status'] in (COMPLETED, FAILED):
+                if stream_format == 'ndjson':
+                    # Trailing line so clients can tell a finished stream from a dropped one
+                    summary = {'job_id': job_id, 'status': job['status'], 'error': job['error']}
+                    if batch and job['output']:
+                        summary['queries'] = job['output']['queries']
+                    yield to_ndjson_chunk([summary])
+                return
+            time.sleep(STREAM_POLL_INTERVAL)
+
+    return Response(generate(), mimetype=STREAM_FORMATS[stream_format], headers={'X-Job-Id': job_id})
+
+
+def search_local_index(data):
+    """Answer a search from the local index without touching the browser"""
+    start = time.perf_counter()
+    limit = int(data.get('max_results') or DEFAULT_MAX_RESULTS)
+    results = search_index.search(data.get('keywords', ''), data.get('location'), limit=limit)
+    return {
+        'status': 'success',
+        'source': 'local',
+        'message': f'Found {len(results)} results',
+        'results': results,
+        'took_ms': round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+@app.route('/search/local', methods=['GET', 'POST'])
+def search_local():
+    data = request.get_json(silent=True) or request.args.to_dict()
+    if not data.get('keywords'):
+        return jsonify({'error': 'Missing required field: keywords'}), 400
+    error = invalid_filter(data)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(search_local_index(data))
+
+
 @app.route('/scrape', methods=['POST'])
 def scrape_resumes():
     try:
@@ -34,39 +389,61 @@ def scrape_resumes():
                     'error': f'Missing required field: {field}'
                 }), 400
         
-        # Initialize scraper
-        logger.debug("Initializing scraper...")
-        scraper = IndeedResumeScraper()
+        if 'queries' in data:
+            return jsonify({
+                'error': 'Use /scrape/batch to run several queries'
+            }), 400
+        
+        error = invalid_filter(data)
+        if error:
+            return jsonify({
+                'error': error
+            }), 400
         
-        # Login to Indeed
-        logger.debug("Attempting to login...")
-        if not scraper.login():
+        source = data.get('source', 'live')
+        if source not in SOURCES:
             return jsonify({
-                'error': 'Failed to login to Indeed'
-            }), 500
+                'error': f'Unsupported source: {source}'
+            }), 400
         
-        # Perform search
-        logger.debug("Starting resume search...")
-        results = scraper.search_resumes(data)
+        stream_format = data.get('stream')
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({
+                'error': f'Unsupported stream format: {stream_format}'
+            }), 400
         
-        # Export results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_dir = os.path.join(os.getcwd(), 'output')
-        os.makedirs(output_dir, exist_ok=True)
+        if source == 'local':
+            return jsonify(search_local_index(data))
         
-        csv_path = os.path.join(output_dir, f'results_{timestamp}.csv')
-        scraper.export_to_csv(results, csv_path)
+        if data.get('cache', True):
+            job_id, cache_info = result_cache.get_or_enqueue(data, job_queue.enqueue)
+        else:
+            job_id, cache_info = job_queue.enqueue(data), {'hit': False, 'in_flight': False, 'age_seconds': None}
         
-        # Cleanup
-        scraper.cleanup()
+        if stream_format:
+            return stream_job_results(job_id, stream_format)
         
-        # Return results
-        return jsonify({
-            'status': 'success',
-            'message': f'Found {len(results)} results',
-            'results': results,
-            'csv_path': csv_path
-        })
+        if cache_info['hit'] and not cache_info['in_flight']:
+            job = job_queue.get(job_id)
+            return jsonify({
+                'status': 'success',
+                'job_id': job_id,
+                'message': job['output']['message'],
+                'results': job_queue.get_results(job_id),
+                'csv_path': job['output']['csv_path'],
+                'cache': cache_info
+            })
+        
+        response = {
+            'status': 'queued',
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'results_url': f'/jobs/{job_id}/results',
+            'cache': cache_info
+        }
+        if source == 'hybrid':
+            response['local'] = search_local_index(data)
+        return jsonify(response), 202
         
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
@@ -76,6 +453,105 @@ def scrape_resumes():
             'traceback': traceback.format_exc()
         }), 500
 
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not queries:
+            return jsonify({
+                'error': 'Missing required field: queries'
+            }), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({
+                'error': f'Too many queries: {len(queries)} (limit {MAX_BATCH_QUERIES})'
+            }), 400
+        
+        stream_format = data.get('stream')
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({
+                'error': f'Unsupported stream format: {stream_format}'
+            }), 400
+        
+        # Top-level fields such as max_results apply to every query that does not set its own
+        defaults = {key: value for key, value in data.items() if key not in ('queries', 'stream')}
+        batch = []
+        for index, query in enumerate(queries):
+            if not isinstance(query, dict):
+                return jsonify({
+                    'error': f'Query {index} is not an object'
+                }), 400
+            query = {**defaults, **query}
+            for field in ('keywords', 'location'):
+                if field not in query:
+                    return jsonify({
+                        'error': f'Missing required field in query {index}: {field}'
+                    }), 400
+            error = invalid_filter(query)
+            if error:
+                return jsonify({
+                    'error': f'{error} in query {index}'
+                }), 400
+            if query.get('source', 'live') not in ('live', 'hybrid'):
+                return jsonify({
+                    'error': f'Unsupported source in query {index}: {query["source"]}'
+                }), 400
+            batch.append(query)
+        
+        job_id = job_queue.enqueue({'queries': batch}, kind=BATCH_JOB)
+        if stream_format:
+            return stream_job_results(job_id, stream_format)
+        
+        return jsonify({
+            'status': 'queued',
+            'job_id': job_id,
+            'query_count': len(batch),
+            'status_url': f'/jobs/{job_id}',
+            'results_url': f'/jobs/{job_id}/results'
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Error processing batch request: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    
+    stream_format = request.args.get('format')
+    if stream_format:
+        if stream_format not in STREAM_FORMATS:
+            return jsonify({'error': f'Unsupported stream format: {stream_format}'}), 400
+        return stream_job_results(job_id, stream_format)
+    
+    offset = request.args.get('offset', 0, type=int)
+    results = job_queue.get_results(job_id, offset=offset)
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'offset': offset,
+        'results': results,
+        'csv_path': (job['output'] or {}).get('csv_path'),
+        'error': job['error']
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -84,5 +560,11 @@ def health_check():
     })
 
 if __name__ == '__main__':
+    # Browsers start with the first job unless asked to log in ahead of time
+    if SESSION_WARMUP:
+        session_pool.start()
+    job_queue.start()
+    if uploader is not None:
+        uploader.start()
     port = int(os.getenv('PORT', 5000))
     app.run(host='0.0.0.0', port=port) 
\ No newline at end of file